@@ -9,7 +9,9 @@ import typing
 import faker
 import fastapi.testclient
 import pytest
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, SQLModel, text
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.pool import StaticPool
 
 from tmo import config
@@ -26,9 +28,16 @@ def pytest_addoption(parser: pytest.Parser) -> None:
 
 
 @pytest.fixture(scope="module")
-def session(database_values: dict[str, list[dict[str, typing.Any]]], request: pytest.FixtureRequest):
+def session(
+    database_values: dict[str, list[dict[str, typing.Any]]],
+    request: pytest.FixtureRequest,
+    tmp_path_factory: pytest.TempPathFactory,
+):
+    # A file rather than memory, so that the API's async engine sees the same database
+    path = tmp_path_factory.mktemp("database").joinpath("tmo.db")
+
     with config.patch(
-        database={"dialect": "memory", "echo": request.config.getoption("--sql-echo")},
+        database={"dialect": "sqlite", "path": str(path), "echo": request.config.getoption("--sql-echo")},
         frontend={
             "colors": {subscriber["number"]: faker.Faker().hex_color() for subscriber in database_values["subscriber"]}
         },
@@ -41,6 +50,7 @@ def session(database_values: dict[str, list[dict[str, typing.Any]]], request: py
             yield _session
 
         SQLModel.metadata.drop_all(engine)
+        engine.dispose()
 
 
 @pytest.fixture(scope="session")
@@ -68,13 +78,21 @@ def insert_into_database(session: Session):
     for line in raw_data.splitlines():
         session.exec(text(line))  # type: ignore[call-overload]
 
+    session.commit()
+
     yield
 
 
 @pytest.fixture(scope="module")
 def client(session: Session, tmp_path_factory: pytest.TempPathFactory):
-    def _get_session_test():
-        return session
+    from tmo.db.engines import start_engine
+
+    # Without pooling, no connection outlives the event loop of the client that opened it
+    engine = start_engine({"pool": NullPool}, asynchronous=True)
+
+    async def _get_async_session_test():
+        async with AsyncSession(engine, expire_on_commit=False) as _session:
+            yield _session
 
     path = tmp_path_factory.getbasetemp().joinpath("config.json")
 
@@ -83,10 +101,10 @@ def client(session: Session, tmp_path_factory: pytest.TempPathFactory):
         path.write_text(json.dumps(config.model_dump(mode="json")), encoding="utf8")
 
         from tmo.web.app import app
-        from tmo.web.dependencies import get_session
+        from tmo.web.dependencies import get_async_session
 
         with fastapi.testclient.TestClient(app) as client:
-            app.dependency_overrides[get_session] = _get_session_test
+            app.dependency_overrides[get_async_session] = _get_async_session_test
             yield client
 
 
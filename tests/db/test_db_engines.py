@@ -1,14 +1,17 @@
 # mypy: disable-error-code="no-untyped-def"
 
+import asyncio
 import logging
 import pathlib
 import secrets
 import unittest.mock
 
 import pytest
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from tmo import config
-from tmo.db.engines import start_engine
+from tmo.db.engines import create_tables, start_engine
 from tmo.db.highlight import _LOGGER_NAME, _SqlHandler
 
 
@@ -29,6 +32,28 @@ def test_sqlite_source(source: str, tmp_path: pathlib.Path):
         assert engine.url.database in (path, str(path))
 
 
+def test_sqlite_async_source(tmp_path: pathlib.Path):
+    path = tmp_path.joinpath(secrets.token_hex())
+
+    async def tables(engine: AsyncEngine) -> list[str]:
+        await create_tables(engine)
+
+        async with engine.connect() as connection:
+            names = await connection.run_sync(lambda sync: inspect(sync).get_table_names())
+
+        await engine.dispose()
+
+        return names
+
+    with config.patch(database={"dialect": "sqlite", "path": path}):
+        engine = start_engine(asynchronous=True)
+
+    assert isinstance(engine, AsyncEngine) and engine.url.drivername == "sqlite+aiosqlite"
+    assert not path.exists()
+
+    assert "bill" in asyncio.run(tables(engine)) and path.exists()
+
+
 def test_postgres_source(monkeypatch: pytest.MonkeyPatch):
     name = secrets.token_hex()
 
@@ -54,6 +79,22 @@ def test_postgres_source(monkeypatch: pytest.MonkeyPatch):
         assert engine.url.database == name and mock_call.call_count == 1
 
 
+def test_postgres_async_source():
+    database = {
+        "dialect": "postgres",
+        "username": "postgres",
+        "password": "password",
+        "database": "tmo",
+        "host": "localhost",
+    }
+
+    with config.patch(database=database):
+        engine = start_engine(asynchronous=True)
+
+    assert isinstance(engine, AsyncEngine) and engine.dialect.is_async
+    assert engine.url.drivername == "postgresql+psycopg"
+
+
 def test_invalid_database_type(caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch):
     mock = unittest.mock.Mock()
     monkeypatch.setattr(config, "database", mock)
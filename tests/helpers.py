@@ -7,6 +7,17 @@ import faker as _faker
 
 faker = _faker.Faker()
 
+REPORT = """\
+Charges and Usage Summary
+Billing Period Ending February 2024
+Account,123456789
+
+Subscriber Number,Plans,Equipment,Services,One-time Charges,Usage Charges,Immediate Charges,Credits and Adjustments,Taxes and Fees,Talk Minutes,Text Messages,Data 
+5551234567,$60.00,$25.50,$0.00,$0.00,$0.00,$0.00,$0.00,$4.00,120,300,2.5
+5559876543,$30.00,$0.00,$0.00,$0.00,$0.00,$0.00,$0.00,$2.00,15,"1000",0.5
+Account Level,$10.00,$0.00,$0.00,$0.00,$0.00,$0.00,$0.00,$1.00,0,0,0
+"""
+
 
 class CompareDict(collections.UserDict[str, typing.Any]):
     def __eq__(self, other: object) -> bool:
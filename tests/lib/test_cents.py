@@ -0,0 +1,48 @@
+# mypy: disable-error-code="no-untyped-def"
+
+import decimal
+
+import pytest
+
+from tmo.lib import cents
+
+
+@pytest.mark.parametrize(
+    ("text", "value"),
+    (
+        ("12.34", 1234),
+        ("$1,234.5", 123450),
+        ("-0.05", -5),
+        ("7", 700),
+        (".5", 50),
+        ("0.125", 12),
+        ("0.135", 14),
+    ),
+)
+def test_parse(text: str, value: int):
+    assert cents.parse(text) == value
+
+
+@pytest.mark.parametrize("text", ("", "-", "abc", "1.2.3"))
+def test_parse_invalid(text: str):
+    with pytest.raises(ValueError, match="Invalid amount"):
+        cents.parse(text)
+
+
+def test_decimal_round_trip():
+    assert cents.to_decimal(cents.from_decimal(decimal.Decimal("33.335"))) == decimal.Decimal("33.34")
+    assert str(cents.to_decimal(0)) == "0.00" and str(cents.to_decimal(-5)) == "-0.05"
+
+
+@pytest.mark.parametrize(
+    ("total", "parts", "shares"),
+    (
+        (10000, 3, [3334, 3333, 3333]),
+        (10001, 3, [3334, 3334, 3333]),
+        (-5, 2, [-2, -3]),
+        (100, 0, []),
+    ),
+)
+def test_split(total: int, parts: int, shares: list[int]):
+    assert cents.split(total, parts) == shares
+    assert sum(shares) == (total if parts else 0)
@@ -0,0 +1,41 @@
+# mypy: disable-error-code="no-untyped-def"
+
+import pytest
+
+from tmo.lib.index import Entry, SubscriberIndex, normalize_number
+
+
+@pytest.mark.parametrize("number", ("555-123-4567", "5551234567", "(555) 123 4567", "555.123.4567"))
+def test_normalize_number(number: str):
+    assert normalize_number(number) == "5551234567"
+
+
+def test_from_numbers():
+    index = SubscriberIndex.from_numbers({"555-123-4567": "Alice", "555-987-6543": "Bob"})
+
+    assert len(index) == 2 and "5559876543" in index
+    assert index.get("5551234567") == Entry("555-123-4567", "Alice")
+    assert index.get("0000000000") is None
+
+
+@pytest.mark.parametrize(("key", "value"), (("name", "Bob"), ("number", "555 987 6543")))
+def test_lookup(key: str, value: str):
+    index = SubscriberIndex([Entry("555-123-4567", "Alice"), Entry("555-987-6543", "Bob")])
+
+    assert index.lookup(**{key: value}).name == "Bob"
+
+    with pytest.raises(LookupError, match="Could not find the user: Carol"):
+        index.lookup(**{key: "Carol"})
+
+
+def test_lookup_first_wins():
+    index = SubscriberIndex([Entry("555-123-4567", "Alice"), Entry("5551234567", "Alice")])
+
+    assert index.lookup(number="5551234567").number == "555-123-4567"
+    assert index.lookup(name="Alice").number == "555-123-4567"
+
+
+@pytest.mark.parametrize("kwargs", ({}, {"name": "Alice", "number": "5551234567"}), ids=("neither", "both"))
+def test_lookup_invalid_usage(kwargs: dict[str, str]):
+    with pytest.raises(ValueError, match="Must supply exactly one of name or number"):
+        SubscriberIndex([Entry("555-123-4567", "Alice")]).lookup(**kwargs)
@@ -0,0 +1,26 @@
+# mypy: disable-error-code="no-untyped-def"
+
+import decimal
+import json
+
+import pytest
+
+from tmo.lib.records import RecordDecoder
+
+
+@pytest.mark.parametrize("text", ('[1, 23, {"a": 4.5}, "b"]', '1\n23\n{"a": 4.5}\n"b"'), ids=("json", "ndjson"))
+@pytest.mark.parametrize("size", (1, 2, 100))
+def test_record_decoder(text: str, size: int):
+    decoder = RecordDecoder()
+    values = [value for index in range(0, len(text), size) for value in decoder.feed(text[index : index + size])]
+
+    assert [*values, *decoder.close()] == [1, 23, {"a": decimal.Decimal("4.5")}, "b"]
+
+
+@pytest.mark.parametrize("text", ("[1, 2", "[1] 2", "1\n{"), ids=("unterminated", "extra", "truncated"))
+def test_record_decoder_invalid(text: str):
+    decoder = RecordDecoder()
+
+    with pytest.raises(json.JSONDecodeError):
+        decoder.feed(text)
+        decoder.close()
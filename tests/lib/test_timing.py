@@ -0,0 +1,79 @@
+# mypy: disable-error-code="no-untyped-def"
+
+import asyncio
+import json
+import pathlib
+
+import pytest
+
+from tmo.lib import timing
+
+
+@timing.timed("sync")
+def _sync(value: int) -> int:
+    return value * 2
+
+
+@timing.timed("async")
+async def _async(value: int) -> int:
+    await asyncio.sleep(0)
+    return value * 2
+
+
+@timing.timed("failure")
+def _failure() -> None:
+    raise ValueError
+
+
+def test_no_active_run():
+    assert _sync(2) == 4
+
+    with timing.span("nothing") as span:
+        assert span is None
+
+
+def test_spans():
+    with timing.run("test") as run:
+        assert _sync(1) == 2
+        assert asyncio.run(_async(2)) == 4
+
+        with pytest.raises(ValueError):
+            _failure()
+
+        with timing.span("block"):
+            _sync(3)
+
+    assert [span.name for span in run.spans] == ["sync", "async", "failure", "block", "sync"]
+    assert [span.ok for span in run.spans] == [True, True, False, True, True]
+    assert run.ok and run.duration >= sum(span.duration for span in run.spans[:4])
+    assert set(run.totals()) == {"sync", "async", "failure", "block"}
+
+
+def test_concurrent_tasks_share_the_run():
+    async def main() -> None:
+        await asyncio.gather(*(_async(index) for index in range(3)))
+
+    with timing.run("test") as run:
+        asyncio.run(main())
+
+    assert len(run.spans) == 3
+
+
+def test_failed_run():
+    with pytest.raises(RuntimeError), timing.run("test") as run:
+        raise RuntimeError
+
+    assert not run.ok
+
+
+def test_write(tmp_path: pathlib.Path):
+    metrics = tmp_path.joinpath("metrics", "runs.ndjson")
+
+    for _ in range(2):
+        with timing.run("test") as run:
+            _sync(1)
+
+        path = run.write(tmp_path.joinpath("runs"), metrics)
+
+    assert json.loads(path.read_text(encoding="utf8"))["totals"].keys() == {"sync"}
+    assert len(metrics.read_text(encoding="utf8").splitlines()) == 2
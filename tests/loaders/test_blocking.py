@@ -0,0 +1,43 @@
+# mypy: disable-error-code="no-untyped-def,arg-type"
+
+import asyncio
+import types
+
+import pytest
+
+from tmo.config import Blocking
+from tmo.loaders.blocking import Blocker
+
+
+class _FakeRoute:
+    def __init__(self, url: str, resource_type: str) -> None:
+        self.request = types.SimpleNamespace(url=url, resource_type=resource_type)
+        self.action = ""
+
+    async def fallback(self) -> None:
+        self.action = "fallback"
+
+    async def abort(self, error_code: str = "") -> None:
+        self.action = "abort"
+
+
+@pytest.mark.parametrize(
+    ("url", "resource_type", "action"),
+    (
+        ("https://tfb.t-mobile.com/dashboard", "document", "fallback"),
+        ("https://t-mobile.com/api/reports", "xhr", "fallback"),
+        ("https://tfb.t-mobile.com/logo.png", "image", "abort"),
+        ("https://www.google-analytics.com/collect", "script", "abort"),
+        ("https://not-t-mobile.com/script.js", "script", "abort"),
+        ("data:image/png;base64,AAAA", "image", "fallback"),
+    ),
+    ids=("document", "first-party-xhr", "image", "third-party", "lookalike-domain", "data-url"),
+)
+def test_route(url: str, resource_type: str, action: str):
+    blocker = Blocker(Blocking(allow=["t-mobile.com"]))
+    route = _FakeRoute(url, resource_type)
+
+    asyncio.run(blocker._route(route))
+
+    assert route.action == action
+    assert blocker.blocked.total() == (action == "abort")
@@ -0,0 +1,379 @@
+# mypy: disable-error-code="no-untyped-def"
+
+import datetime
+import decimal
+import json
+import pathlib
+
+import pydantic
+import pytest
+from sqlalchemy import Engine
+from sqlmodel import Session, col, select
+
+from tmo import config
+from tmo.db.engines import start_engine
+from tmo.db.models import Bill, Subscriber
+from tmo.loaders.bulk import Identities, read_bills, write_db
+from tmo.loaders.convert import dump
+from tmo.web.routers.models.post import FillSubscriber, PostCharge, PostFilledBill
+
+
+@pytest.fixture
+def bills() -> list[PostFilledBill]:
+    return [
+        PostFilledBill(
+            date=datetime.date(2024, month, 1),
+            total=decimal.Decimal("12.34") * month,
+            charges=[PostCharge(name="taxes", split=True, total=decimal.Decimal("1.10"))],
+            subscribers=[
+                FillSubscriber(name=f"Name {index}", number=f"555-000-000{index}", phone=decimal.Decimal("0.10"))
+                for index in range(3)
+            ],
+        )
+        for month in range(1, 13)
+    ]
+
+
+@pytest.mark.parametrize("ndjson", (True, False), ids=("ndjson", "json"))
+@pytest.mark.parametrize("chunk_size", (16, 1 << 16), ids=("small-chunks", "default"))
+def test_read_bills(tmp_path: pathlib.Path, bills: list[PostFilledBill], ndjson: bool, chunk_size: int):
+    path = tmp_path.joinpath("bills.json")
+
+    with path.open("w", encoding="utf8") as stream:
+        dump(bills, stream, ndjson=ndjson)
+
+    assert list(read_bills(path, chunk_size=chunk_size)) == bills
+
+
+def test_read_bills_compact(tmp_path: pathlib.Path, bills: list[PostFilledBill]):
+    path = tmp_path.joinpath("bills.json")
+    path.write_text(json.dumps([bill.model_dump(mode="json") for bill in bills], separators=(",", ":")))
+
+    assert [bill.date for bill in read_bills(path, chunk_size=32)] == [bill.date for bill in bills]
+
+
+def test_read_bills_lazy(tmp_path: pathlib.Path, bills: list[PostFilledBill]):
+    path = tmp_path.joinpath("bills.json")
+
+    with path.open("w", encoding="utf8") as stream:
+        dump(bills, stream)
+
+    path.write_text(path.read_text(encoding="utf8")[:-10], encoding="utf8")
+    reader = read_bills(path, chunk_size=64)
+
+    assert next(reader) == bills[0]
+
+    with pytest.raises(json.JSONDecodeError):
+        list(reader)
+
+
+@pytest.mark.parametrize("content", ("", "[", '[{"date": "2024-01-01"}'), ids=("empty", "open", "unterminated"))
+def test_read_bills_invalid(tmp_path: pathlib.Path, content: str):
+    path = tmp_path.joinpath("bills.json")
+    path.write_text(content, encoding="utf8")
+
+    if content:
+        with pytest.raises(json.JSONDecodeError):
+            list(read_bills(path))
+
+    else:
+        assert list(read_bills(path)) == []
+
+
+@pytest.fixture
+def engine(tmp_path: pathlib.Path):
+    with config.patch(
+        database={"dialect": "sqlite", "path": str(tmp_path.joinpath("db.sqlite3"))},
+        load={"names": {"default": "Smith"}},
+    ):
+        engine = start_engine()
+
+        yield engine
+
+        engine.dispose()
+
+
+@pytest.mark.parametrize("batch_size", (1, 5, 500))
+def test_write_db(tmp_path: pathlib.Path, engine: Engine, bills: list[PostFilledBill], batch_size: int):
+    path = tmp_path.joinpath("bills.json")
+    extra = PostFilledBill(
+        date=bills[0].date,
+        subscribers=[FillSubscriber(name="Name 0", number="555-000-0000", phone=decimal.Decimal("1.00"))],
+    )
+
+    with path.open("w", encoding="utf8") as stream:
+        dump([*bills, extra], stream, ndjson=True)
+
+    write_db(path, batch_size=batch_size)
+
+    with Session(engine) as session:
+        stored = session.exec(select(Bill).order_by(col(Bill.date))).all()
+        subscribers = session.exec(select(Subscriber)).all()
+
+        assert [bill.date for bill in stored] == [bill.date for bill in bills]
+        assert stored[0].total == decimal.Decimal("2.40")
+        assert all(bill.total == decimal.Decimal("1.40") for bill in stored[1:])
+        assert sorted(subscriber.name for subscriber in subscribers) == [f"Name {index} Smith" for index in range(3)]
+
+        assert len(stored[0].details) == 4 and len(stored[0].subscribers) == 3 and len(stored[0].charges) == 1
+        assert all(len(bill.details) == 3 and len(bill.subscribers) == 3 for bill in stored[1:])
+
+
+def test_write_db_resume(tmp_path: pathlib.Path, engine: Engine, bills: list[PostFilledBill]):
+    path = tmp_path.joinpath("bills.json")
+
+    with path.open("w", encoding="utf8") as stream:
+        dump(bills, stream, ndjson=True)
+
+    broken = path.read_text(encoding="utf8").splitlines(keepends=True)
+    broken[7] = "{}\n"
+    path.write_text("".join(broken), encoding="utf8")
+
+    with pytest.raises(pydantic.ValidationError):
+        write_db(path, batch_size=2, chunk_size=3)
+
+    with Session(engine) as session:
+        assert len(session.exec(select(Bill)).all()) == 6
+
+    with path.open("w", encoding="utf8") as stream:
+        dump(bills, stream, ndjson=True)
+
+    loader = write_db(path, batch_size=2, chunk_size=3)
+
+    assert (loader.committed, loader.skipped) == (6, 6)
+
+    with Session(engine) as session:
+        stored = session.exec(select(Bill).order_by(col(Bill.date))).all()
+
+        assert [bill.date for bill in stored] == [bill.date for bill in bills]
+        assert len(session.exec(select(Subscriber)).all()) == 3
+        assert all(len(bill.details) == 3 and len(bill.subscribers) == 3 for bill in stored)
+
+
+def test_write_db_resume_repeated_date(tmp_path: pathlib.Path, engine: Engine, bills: list[PostFilledBill]):
+    path = tmp_path.joinpath("bills.json")
+    extra = PostFilledBill(
+        date=bills[0].date,
+        subscribers=[FillSubscriber(name="Name 0", number="555-000-0000", phone=decimal.Decimal("5.00"))],
+    )
+    records = [bills[0], bills[1], extra, bills[2]]
+
+    with path.open("w", encoding="utf8") as stream:
+        dump(records, stream, ndjson=True)
+
+    path.write_text(path.read_text(encoding="utf8").replace(records[3].model_dump_json(), "{}"), encoding="utf8")
+
+    with pytest.raises(pydantic.ValidationError):
+        write_db(path, chunk_size=2)
+
+    assert json.loads(path.with_name("bills.json.checkpoint").read_text(encoding="utf8"))["records"] == 2
+
+    with path.open("w", encoding="utf8") as stream:
+        dump(records, stream, ndjson=True)
+
+    loader = write_db(path, chunk_size=2)
+
+    assert (loader.committed, loader.skipped) == (2, 2)
+    assert not path.with_name("bills.json.checkpoint").exists()
+
+    with Session(engine) as session:
+        first = session.exec(select(Bill).where(Bill.date == bills[0].date)).one()
+
+        assert first.total == decimal.Decimal("6.40") and len(first.details) == 4
+
+    assert write_db(path).skipped == 4
+
+
+def test_write_db_resume_changed_file(tmp_path: pathlib.Path, engine: Engine, bills: list[PostFilledBill]):
+    path = tmp_path.joinpath("bills.json")
+    extra = PostFilledBill(
+        date=bills[0].date,
+        subscribers=[FillSubscriber(name="Name 0", number="555-000-0000", phone=decimal.Decimal("5.00"))],
+    )
+
+    with path.open("w", encoding="utf8") as stream:
+        dump([bills[0], bills[1], extra, bills[2]], stream, ndjson=True)
+
+    path.write_text(path.read_text(encoding="utf8").replace(bills[2].model_dump_json(), "{}"), encoding="utf8")
+
+    with pytest.raises(pydantic.ValidationError):
+        write_db(path, chunk_size=2)
+
+    # The committed records are no longer the first two of the file, so the checkpoint doesn't apply to it anymore
+    with path.open("w", encoding="utf8") as stream:
+        dump([bills[1], bills[0], extra, bills[2]], stream, ndjson=True)
+
+    loader = write_db(path, chunk_size=2)
+
+    assert (loader.resume_from, loader.committed, loader.skipped) == (0, 1, 3)
+
+    with Session(engine) as session:
+        first = session.exec(select(Bill).where(Bill.date == bills[0].date)).one()
+
+        assert first.total == decimal.Decimal("1.40") and len(first.details) == 3
+
+
+def test_write_db_merge_across_chunks(tmp_path: pathlib.Path, engine: Engine, bills: list[PostFilledBill]):
+    path = tmp_path.joinpath("bills.json")
+
+    with path.open("w", encoding="utf8") as stream:
+        dump([*bills, bills[0]], stream, ndjson=True)
+
+    write_db(path, chunk_size=2)
+
+    with Session(engine) as session:
+        first = session.exec(select(Bill).where(Bill.date == bills[0].date)).one()
+
+        assert len(first.details) == 6 and len(first.subscribers) == 3
+        assert first.total == decimal.Decimal("2.80")
+
+
+def test_write_db_upsert(tmp_path: pathlib.Path, engine: Engine, bills: list[PostFilledBill]):
+    path = tmp_path.joinpath("bills.json")
+
+    with path.open("w", encoding="utf8") as stream:
+        dump(bills, stream, ndjson=True)
+
+    write_db(path)
+
+    assert not write_db(path, upsert=True).changes.changed
+
+    bills[3].subscribers[1].phone = decimal.Decimal("5.00")
+    bills[3].subscribers.pop(2)
+    bills[4].charges[0].total = decimal.Decimal("2.00")
+
+    with path.open("w", encoding="utf8") as stream:
+        dump(bills, stream, ndjson=True)
+
+    changes = write_db(path, upsert=True, batch_size=5).changes
+
+    assert (changes.bills, changes.subscribers, changes.details, changes.charges, changes.deleted) == (2, 0, 1, 1, 1)
+
+    with Session(engine) as session:
+        stored = session.exec(select(Bill).order_by(col(Bill.date))).all()
+
+        assert [len(bill.details) for bill in stored] == [3, 3, 3, 2, *[3] * 8]
+        assert [len(bill.subscribers) for bill in stored] == [3, 3, 3, 2, *[3] * 8]
+        assert stored[3].total == decimal.Decimal("6.20") and stored[4].total == decimal.Decimal("2.30")
+
+
+@pytest.mark.parametrize("batch_size", (1, 500))
+def test_write_db_upsert_merge(tmp_path: pathlib.Path, engine: Engine, bills: list[PostFilledBill], batch_size: int):
+    path = tmp_path.joinpath("bills.json")
+    extra = PostFilledBill(
+        date=bills[0].date,
+        charges=[PostCharge(name="taxes", split=True, total=decimal.Decimal("0.50"))],
+        subscribers=[FillSubscriber(name="Name 0", number="555-000-0000", phone=decimal.Decimal("1.00"))],
+    )
+
+    with path.open("w", encoding="utf8") as stream:
+        dump([bills[0], bills[1], extra], stream, ndjson=True)
+
+    write_db(path, upsert=True, batch_size=batch_size)
+
+    with Session(engine) as session:
+        first = session.exec(select(Bill).where(Bill.date == bills[0].date)).one()
+        details = {detail.subscriber.number: detail.phone for detail in first.details}
+
+        assert first.total == decimal.Decimal("2.90")
+        assert details == {
+            "555-000-0000": decimal.Decimal("1.10"),
+            **{f"555-000-000{i}": decimal.Decimal("0.10") for i in (1, 2)},
+        }
+        assert [(charge.name, charge.total) for charge in first.charges] == [("taxes", decimal.Decimal("1.60"))]
+
+    assert not write_db(path, upsert=True).changes.changed
+
+
+def test_write_db_plain_then_upsert_merge(tmp_path: pathlib.Path, engine: Engine, bills: list[PostFilledBill]):
+    path = tmp_path.joinpath("bills.json")
+    extra = PostFilledBill(
+        date=bills[0].date,
+        charges=[PostCharge(name="taxes", split=True, total=decimal.Decimal("0.50"))],
+        subscribers=[FillSubscriber(name="Name 0", number="555-000-0000", phone=decimal.Decimal("1.00"))],
+    )
+
+    with path.open("w", encoding="utf8") as stream:
+        dump([bills[0], bills[1], extra], stream, ndjson=True)
+
+    write_db(path)
+
+    with Session(engine) as session:
+        first = session.exec(select(Bill).where(Bill.date == bills[0].date)).one()
+
+        assert len(first.details) == 4 and len(first.charges) == 2
+
+    # The repeated subscriber and charge of the plain load are merged into a single row each
+    loader = write_db(path, upsert=True)
+
+    assert (loader.changes.details, loader.changes.charges, loader.changes.deleted) == (1, 1, 2)
+
+    with Session(engine) as session:
+        first = session.exec(select(Bill).where(Bill.date == bills[0].date)).one()
+        details = {detail.subscriber.number: detail.phone for detail in first.details}
+
+        assert first.total == decimal.Decimal("2.90") and len(first.details) == 3
+        assert details == {
+            "555-000-0000": decimal.Decimal("1.10"),
+            **{f"555-000-000{i}": decimal.Decimal("0.10") for i in (1, 2)},
+        }
+        assert [(charge.name, charge.total) for charge in first.charges] == [("taxes", decimal.Decimal("1.60"))]
+
+    assert not write_db(path, upsert=True).changes.changed
+
+
+def test_identities():
+    cache = Identities[str](maxsize=2)
+    cache.update({"a": 1, "b": 2, "c": 3})
+
+    assert len(cache) == 3 and cache["a"] == 1
+
+    cache.evict()
+
+    assert dict(cache) == {"c": 3, "a": 1}
+
+
+def test_write_db_twice(tmp_path: pathlib.Path, engine: Engine, bills: list[PostFilledBill]):
+    first, second = tmp_path.joinpath("first.json"), tmp_path.joinpath("second.json")
+
+    with first.open("w", encoding="utf8") as stream:
+        dump(bills[:5], stream, ndjson=True)
+
+    with second.open("w", encoding="utf8") as stream:
+        dump([*bills, bills[8]], stream, ndjson=True)
+
+    write_db(first, chunk_size=2, cache_size=1)
+    loader = write_db(second, batch_size=2, chunk_size=2, cache_size=1)
+
+    assert (loader.committed, loader.skipped) == (8, 5)
+    assert len(loader.bills) <= 1 and len(loader.subscribers) <= 1
+
+    with pytest.raises(ValueError, match="already a bill"):
+        write_db(first, resume=False)
+
+    with Session(engine) as session:
+        stored = session.exec(select(Bill).order_by(col(Bill.date))).all()
+
+        assert [bill.date for bill in stored] == [bill.date for bill in bills]
+        assert len(session.exec(select(Subscriber)).all()) == 3
+        assert [len(bill.details) for bill in stored] == [3] * 8 + [6, 3, 3, 3]
+
+
+def test_write_db_dry_run(tmp_path: pathlib.Path, engine: Engine, bills: list[PostFilledBill]):
+    path = tmp_path.joinpath("bills.json")
+
+    with path.open("w", encoding="utf8") as stream:
+        dump(bills, stream)
+
+    profile = write_db(path, batch_size=5, chunk_size=5, dry_run=True).profile
+
+    with Session(engine) as session:
+        assert session.exec(select(Bill)).all() == []
+
+    assert profile.records == 12 and profile.peak
+    assert profile.statements < 30, "statements should be issued per batch, not per bill"
+    assert all(getattr(profile, step) > 0 for step in ("parse", "validate", "flush"))
+    assert profile.duration == pytest.approx(profile.parse + profile.validate + profile.flush)
+    assert "12 bills" in str(profile) and f"{profile.statements} SQL statements" in str(profile)
+
+    assert write_db(path, batch_size=5, chunk_size=5).profile.statements == profile.statements
@@ -0,0 +1,66 @@
+# mypy: disable-error-code="no-untyped-def"
+
+import datetime
+import io
+import json
+import pathlib
+
+import pydantic
+import pytest
+
+from tests.helpers import REPORT
+from tmo import config
+from tmo.loaders.convert import convert_directory, dump
+from tmo.web.routers.models.post import PostFilledBill
+
+
+@pytest.fixture
+def directory(tmp_path: pathlib.Path) -> pathlib.Path:
+    for month in ("January", "February", "March"):
+        tmp_path.joinpath(f"{month}.csv").write_text(REPORT.replace("February", month), encoding="utf8")
+
+    tmp_path.joinpath("broken.csv").write_text("Subscriber Number,Plans\n", encoding="utf8")
+    tmp_path.joinpath("notes.txt").write_text("", encoding="utf8")
+
+    return tmp_path
+
+
+def test_convert_directory(directory: pathlib.Path):
+    with config.patch(load={"numbers": {"555-123-4567": "Alice", "555-987-6543": "Bob"}}):
+        results = convert_directory(directory, workers=2)
+
+    assert [result.path.name for result in results] == ["February.csv", "January.csv", "March.csv", "broken.csv"]
+    assert all(result.duration > 0 for result in results)
+
+    *converted, broken = results
+
+    assert [result.bill.date for result in converted if result.bill] == [
+        datetime.date(2024, 3, 1),
+        datetime.date(2024, 2, 1),
+        datetime.date(2024, 4, 1),
+    ]
+    assert all(result.bill and len(result.bill.subscribers) == 2 for result in converted)
+    assert broken.bill is None and broken.error == "ValueError: Could not find the billing period in the report"
+
+
+@pytest.mark.parametrize("ndjson", (True, False), ids=("ndjson", "json"))
+def test_dump(ndjson: bool):
+    bills = [PostFilledBill(date=datetime.date(2024, month, 1)) for month in (1, 2)]
+    stream = io.StringIO()
+
+    dump(bills, stream, ndjson=ndjson)
+
+    if ndjson:
+        loaded = [PostFilledBill.model_validate_json(line) for line in stream.getvalue().splitlines()]
+
+    else:
+        loaded = pydantic.TypeAdapter(list[PostFilledBill]).validate_json(stream.getvalue())
+
+    assert loaded == bills
+
+
+def test_dump_empty():
+    stream = io.StringIO()
+    dump([], stream)
+
+    assert json.loads(stream.getvalue()) == []
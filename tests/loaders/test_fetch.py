@@ -0,0 +1,62 @@
+# mypy: disable-error-code="no-untyped-def"
+
+import datetime
+import decimal
+import pathlib
+
+import pytest
+
+from tests.helpers import REPORT
+from tmo import config
+from tmo.loaders.fetch import format_csv, read_report
+
+
+@pytest.fixture(autouse=True)
+def numbers():
+    with config.patch(load={"numbers": {"555-123-4567": "Alice", "555-987-6543": "Bob"}}):
+        yield
+
+
+def test_read_report():
+    date, rows = read_report(REPORT.splitlines(keepends=True))
+
+    assert date == datetime.date(2024, 3, 1)
+
+    first = next(rows)
+    assert first["Plans"] == "60.00" and first["Data "] == "2.5"
+    assert [row["Text Messages"] for row in rows] == ["1000", "0"]
+
+
+@pytest.mark.parametrize(
+    "report",
+    ("Billing Period Ending February 2024\n", "Subscriber Number,Plans\n"),
+    ids=("no-header", "no-period"),
+)
+def test_read_report_invalid(report: str):
+    with pytest.raises(ValueError):
+        read_report(report.splitlines(keepends=True))
+
+
+@pytest.mark.parametrize("source", ("text", "path"))
+def test_format_csv(tmp_path: pathlib.Path, source: str):
+    if source == "path":
+        data: str | pathlib.Path = tmp_path.joinpath("report.csv")
+        pathlib.Path(data).write_text(REPORT, encoding="utf8")
+
+    else:
+        data = REPORT
+
+    bill = format_csv(data)
+
+    assert bill.date == datetime.date(2024, 3, 1)
+    assert [(sub.number, sub.name) for sub in bill.subscribers] == [("555-123-4567", "Alice"), ("555-987-6543", "Bob")]
+    assert [sub.line for sub in bill.subscribers] == [decimal.Decimal(50)] * 2
+    assert bill.charges[0].total == decimal.Decimal(7)
+    assert bill.total == decimal.Decimal("132.50")
+
+
+def test_format_csv_line_split():
+    bill = format_csv(REPORT.replace("$60.00", "$60.01"))
+
+    assert [sub.line for sub in bill.subscribers] == [decimal.Decimal("50.01"), decimal.Decimal("50.00")]
+    assert bill.total == decimal.Decimal("132.51")
@@ -0,0 +1,78 @@
+# mypy: disable-error-code="no-untyped-def"
+
+import asyncio
+import random
+
+import pytest
+
+from tmo.config import Config, Delay, Pacing
+from tmo.loaders.pacing import Pacer
+
+
+@pytest.mark.parametrize("distribution", ("fixed", "uniform", "normal"))
+def test_sample_bounds(distribution: str):
+    delay = Delay(distribution=distribution, low=0.25, high=0.75)  # type: ignore[arg-type]
+    pacer = Pacer(Pacing(click=delay), rng=random.Random(0))
+
+    samples = [pacer.sample("click") for _ in range(100)]
+
+    assert all(0.25 <= sample <= 0.75 for sample in samples)
+
+    if distribution == "fixed":
+        assert set(samples) == {0.25}
+
+
+def test_invalid_bounds():
+    with pytest.raises(ValueError, match="upper bound"):
+        Delay(low=1, high=0)
+
+
+def test_bounds_from_environment_variables(monkeypatch: pytest.MonkeyPatch):
+    values = {"low": 0.5}
+
+    assert Delay.model_validate(values).high == 0.5 and values == {"low": 0.5}
+
+    with monkeypatch.context() as mp:
+        mp.setenv("TMO_FETCH__USERNAME", "username")
+        mp.setenv("TMO_FETCH__PASSWORD", "password")
+        mp.setenv("TMO_FETCH__PACING__CLICK__LOW", "9")
+        mp.setenv("TMO_FETCH__PACING__CLICK__HIGH", "10")
+        mp.setenv("TMO_FETCH__PACING__KEYSTROKE__HIGH", "5")
+
+        fetch = Config().fetch
+
+    assert fetch is not None
+    assert (fetch.pacing.click.low, fetch.pacing.click.high) == (9, 10)
+    assert (fetch.pacing.keystroke.low, fetch.pacing.keystroke.high) == (0, 5)
+
+
+def test_pacing_is_non_blocking():
+    fixed = Delay(distribution="fixed", low=0.05)
+    pacer = Pacer(Pacing(click=fixed, navigation=fixed))
+    ticks: list[int] = []
+
+    async def ticker() -> None:
+        for tick in range(5):
+            ticks.append(tick)
+            await asyncio.sleep(0)
+
+    async def main() -> None:
+        await asyncio.gather(pacer.pause("click"), pacer.pause("navigation"), ticker())
+
+    asyncio.run(main())
+
+    report = pacer.report()
+
+    assert ticks == [0, 1, 2, 3, 4]
+    assert report.paced == pytest.approx(0.1)
+    assert report.elapsed < report.paced
+
+
+def test_keystroke_accounting():
+    pacer = Pacer(Pacing(keystroke=Delay(distribution="fixed", low=0.1)))
+
+    assert pacer.keystroke(10) == pytest.approx(100)
+    assert pacer.report().paced == pytest.approx(1.0)
+
+    pacer.reset()
+    assert pacer.report().paced == 0
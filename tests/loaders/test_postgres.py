@@ -0,0 +1,33 @@
+# mypy: disable-error-code="no-untyped-def,arg-type"
+
+import datetime
+import decimal
+
+from tmo import config
+from tmo.loaders.postgres import _COLUMNS, CopyLoader
+from tmo.web.routers.models.post import FillSubscriber, PostCharge, PostFilledBill
+
+
+def test_stage():
+    bills = [
+        PostFilledBill(
+            date=datetime.date(2024, month, 1),
+            charges=[PostCharge(name="taxes", split=True, total=decimal.Decimal("1.10"))],
+            subscribers=[
+                FillSubscriber(name="Alice", number="555-000-0000", phone=decimal.Decimal("2.00")),
+                FillSubscriber(name="Bob", number="555-000-0001", line=decimal.Decimal("3.00")),
+            ],
+        )
+        for month in (1, 2)
+    ]
+
+    with config.patch(load={"names": {"default": "Smith"}}):
+        loader = CopyLoader(None)
+        loader.subscribers["555-000-0001"] = 1
+
+    rows = loader.stage(bills)
+
+    assert all(len(row) == len(_COLUMNS[table]) for table, staged in rows.items() for row in staged)
+    assert rows["tmo_stage_bill"] == [(bill.date, decimal.Decimal("6.10")) for bill in bills]
+    assert rows["tmo_stage_subscriber"] == [("555-000-0000", "Alice Smith", "us")]
+    assert len(rows["tmo_stage_detail"]) == 4 and len(rows["tmo_stage_charge"]) == 2
@@ -0,0 +1,62 @@
+# mypy: disable-error-code="no-untyped-def"
+
+import pathlib
+
+import pytest
+
+from tmo.config import Fetch
+from tmo.lib import timing
+from tmo.loaders.fetch import Fetcher
+from tmo.loaders.replay import Fixtures, summarize
+
+
+def test_record_then_replay(tmp_path: pathlib.Path):
+    recorder = Fixtures(tmp_path, mode="record")
+
+    assert recorder.context_options() == {"record_har_path": recorder.har, "record_har_content": "embed"}
+    assert recorder.value("report", "2024-01", lambda: "abc") == "abc"
+    assert recorder.value("report", "2024-02", lambda: "def") == "def"
+    assert recorder.value("totp", "code", lambda: "123456") == "123456"
+
+    recorder.save()
+    recorder.har.write_text("{}", encoding="utf8")
+
+    replay = Fixtures(tmp_path, mode="replay")
+
+    assert replay.context_options() == {}
+    assert replay.months == ["2024-01", "2024-02"]
+    assert replay.value("report", "2024-02", lambda: "unused") == "def"
+    assert replay.value("totp", "code", lambda: "unused") == "123456"
+
+
+def test_replay_pacing_is_seeded(tmp_path: pathlib.Path):
+    recorder = Fixtures(tmp_path, mode="record")
+    recorder.save()
+    recorder.har.write_text("{}", encoding="utf8")
+
+    settings = Fetch(username="", password="", cache=tmp_path)
+    first, second = (Fetcher.from_config(settings, fixtures=Fixtures(tmp_path)).pacer for _ in range(2))
+
+    assert [first.sample("click") for _ in range(5)] == [second.sample("click") for _ in range(5)]
+
+
+def test_replay_requires_recording(tmp_path: pathlib.Path):
+    with pytest.raises(FileNotFoundError):
+        Fixtures(tmp_path, mode="replay")
+
+
+def test_summarize():
+    runs = []
+
+    for _ in range(3):
+        with timing.run("benchmark") as run:
+            for step in ("login", "download", "download"):
+                with timing.span(step):
+                    pass
+
+        runs.append(run)
+
+    summary = summarize(runs)
+
+    assert [step for step, *_ in summary] == ["login", "download", "total"]
+    assert all(low <= mean <= high for _, mean, low, high in summary)
@@ -0,0 +1,161 @@
+# mypy: disable-error-code="no-untyped-def,arg-type"
+
+import asyncio
+import dataclasses
+
+import arrow
+import playwright.async_api as playwright
+import pytest
+
+from tmo.config import Delay, Pacing, Timeouts
+from tmo.loaders.fetch import Fetcher, Report
+from tmo.loaders.pacing import Pacer
+
+SUCCESS = "Your request was successfully processed."
+PROGRESS = "Report Creation in Progress"
+
+
+@dataclasses.dataclass
+class _FakePage:
+    """Just enough of the "My Reports" page: the report row shows up after `ready_after` refreshes of the list."""
+
+    id: str
+    ready_after: int | None = None
+    modal: str | None = None
+    refreshes: int = 0
+    clicks: list[str] = dataclasses.field(default_factory=list)
+
+    def get_by_role(self, role: str, name: str | None = None, exact: bool = False) -> "_FakeLocator":
+        return _FakeLocator(self, (name or role,))
+
+    def visible(self, path: tuple[str, ...]) -> bool:
+        if path[0] == "dialog":
+            return self.modal is not None and path[1:] in ((), (self.modal,))
+
+        if path[0] == self.id:
+            return self.ready_after is not None and self.refreshes >= self.ready_after
+
+        return True
+
+    def click(self, path: tuple[str, ...]) -> None:
+        self.clicks.append(path[-1])
+
+        match path[-1]:
+            case "My Reports":
+                self.refreshes += 1
+
+            case "Close" | "Back":
+                self.modal = None
+
+
+@dataclasses.dataclass
+class _FakeLocator:
+    page: _FakePage
+    path: tuple[str, ...]
+
+    @property
+    def first(self) -> "_FakeLocator":
+        return self
+
+    def get_by_role(self, role: str, name: str | None = None, exact: bool = False) -> "_FakeLocator":
+        return _FakeLocator(self.page, (*self.path, name or role))
+
+    def get_by_text(self, text: str, exact: bool = False) -> "_FakeLocator":
+        return _FakeLocator(self.page, (*self.path, text))
+
+    def or_(self, other: "_FakeLocator") -> "_Either":
+        return _Either(self, other)
+
+    async def is_visible(self) -> bool:
+        return self.page.visible(self.path)
+
+    async def is_enabled(self) -> bool:
+        return self.page.visible(self.path)
+
+    async def wait_for(self, state: str, timeout: float) -> None:
+        if not self.page.visible(self.path):
+            await asyncio.sleep(timeout / 1e3)
+            raise playwright.TimeoutError(f"Timeout {timeout:.0f}ms exceeded.")
+
+    async def click(self) -> None:
+        self.page.click(self.path)
+
+
+@dataclasses.dataclass
+class _Either:
+    left: _FakeLocator
+    right: _FakeLocator
+
+    @property
+    def first(self) -> "_Either":
+        return self
+
+    async def is_visible(self) -> bool:
+        return await self.left.is_visible() or await self.right.is_visible()
+
+
+@dataclasses.dataclass
+class _Expect:
+    locator: _FakeLocator | _Either
+
+    async def to_be_visible(self, timeout: float) -> None:
+        if not await self.locator.is_visible():
+            raise AssertionError("Locator expected to be visible")
+
+
+@pytest.fixture(autouse=True)
+def expect(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(playwright, "expect", _Expect)
+
+
+def run(page: _FakePage, method: str, report: float = 1.0) -> Fetcher:
+    fetcher = Fetcher(
+        pacer=Pacer(Pacing(click=Delay(distribution="fixed"))),
+        timeouts=Timeouts(dialog=0.01, report=report, poll=0.01, poll_max=0.02),
+    )
+    subject = Report(fetcher=fetcher, page=page, date=arrow.get(2024, 3, 1), id=page.id)
+
+    asyncio.run(getattr(subject, method)())
+
+    return fetcher
+
+
+def test_wait_until_ready():
+    page = _FakePage(id="report", ready_after=3)
+    fetcher = run(page, "wait_until_ready")
+
+    assert page.refreshes == 3 and page.clicks == ["My Reports"] * 3
+
+    # Waiting between polls is backoff, not humanized pacing
+    assert fetcher.pacer.paced == 0
+
+
+def test_wait_until_ready_timeout():
+    page = _FakePage(id="report")
+
+    with pytest.raises(TimeoutError, match="Report report was not ready after"):
+        run(page, "wait_until_ready", report=0.05)
+
+    assert page.refreshes > 1
+
+
+@pytest.mark.parametrize(("modal", "button"), ((SUCCESS, "Close"), (PROGRESS, "Back")), ids=("success", "progress"))
+def test_handle_modals(modal: str, button: str):
+    page = _FakePage(id="report", ready_after=1, modal=modal)
+    run(page, "handle_modals")
+
+    assert page.modal is None and page.clicks == [button, "My Reports"]
+
+
+def test_handle_modals_without_dialog():
+    page = _FakePage(id="report", ready_after=0)
+    run(page, "handle_modals")
+
+    assert page.clicks == ["My Reports"]
+
+
+def test_handle_unknown_modal():
+    page = _FakePage(id="report", modal="Something went wrong")
+
+    with pytest.raises(ValueError, match="Unknown modal"):
+        run(page, "handle_modals")
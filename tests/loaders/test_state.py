@@ -0,0 +1,54 @@
+# mypy: disable-error-code="no-untyped-def,typeddict-item"
+
+import datetime
+import pathlib
+import secrets
+
+import playwright.async_api as playwright
+import pytest
+import time_machine
+
+from tmo.loaders.state import StateFile
+
+pytest.importorskip("cryptography")
+
+STATE: playwright.StorageState = {
+    "cookies": [],
+    "origins": [{"origin": "https://example.com", "localStorage": [{"name": "a", "value": "b"}]}],
+}
+
+
+@pytest.fixture
+def path(tmp_path: pathlib.Path) -> pathlib.Path:
+    return tmp_path.joinpath("nested", "state.bin")
+
+
+def test_round_trip(path: pathlib.Path):
+    state = StateFile(path=path, secret=secrets.token_hex())
+    assert state.load() is None
+
+    state.save(STATE)
+
+    assert path.exists() and b"example.com" not in path.read_bytes()
+    assert path.stat().st_mode & 0o777 == 0o600
+    assert state.load() == STATE
+
+
+def test_wrong_secret(path: pathlib.Path):
+    StateFile(path=path, secret=secrets.token_hex()).save(STATE)
+
+    assert StateFile(path=path, secret=secrets.token_hex()).load() is None
+    assert not path.exists()
+
+
+def test_expired(path: pathlib.Path, time_machine: time_machine.TimeMachineFixture):
+    state = StateFile(path=path, secret=secrets.token_hex(), lifetime=datetime.timedelta(hours=1))
+
+    time_machine.move_to(datetime.datetime(2024, 1, 1, 0, 0, tzinfo=datetime.UTC))
+    state.save(STATE)
+
+    time_machine.move_to(datetime.datetime(2024, 1, 1, 0, 30, tzinfo=datetime.UTC))
+    assert state.load() == STATE
+
+    time_machine.move_to(datetime.datetime(2024, 1, 1, 2, 0, tzinfo=datetime.UTC))
+    assert state.load() is None
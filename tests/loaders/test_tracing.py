@@ -0,0 +1,101 @@
+# mypy: disable-error-code="no-untyped-def,arg-type"
+
+import asyncio
+import pathlib
+import types
+import typing
+
+import pytest
+
+from tmo.config import Tracing
+from tmo.loaders.tracing import Tracer
+
+
+class _FakeTracing:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.recording = False
+
+    async def start(self, **kwargs: typing.Any) -> None:
+        self.calls.append("start")
+
+    async def start_chunk(self, **kwargs: typing.Any) -> None:
+        # Like Playwright, a chunk can't be started while one is recording (or being stopped)
+        assert not self.recording, "A chunk is already recording"
+        self.recording = True
+        await asyncio.sleep(0)
+
+        self.calls.append("start_chunk")
+
+    async def stop_chunk(self, path: pathlib.Path | None = None) -> None:
+        assert self.recording, "No chunk is recording"
+        self.calls.append("stop_chunk")
+        await asyncio.sleep(0)
+        self.recording = False
+
+        if path:
+            path.write_bytes(b"chunk")
+
+    async def stop(self, path: pathlib.Path | None = None) -> None:
+        self.calls.append("stop")
+
+        if path:
+            path.write_bytes(b"trace")
+
+
+def run(tracer: Tracer, steps: int = 5, failed: bool = False, pages: int = 1) -> _FakeTracing:
+    tracing = _FakeTracing()
+
+    async def page() -> None:
+        for step in range(steps):
+            await tracer.checkpoint(str(step))
+
+    async def main() -> None:
+        await tracer.start(types.SimpleNamespace(tracing=tracing))
+        await asyncio.gather(*(page() for _ in range(pages)))
+        await tracer.stop(failed=failed)
+
+    asyncio.run(main())
+
+    return tracing
+
+
+def test_off(tmp_path: pathlib.Path):
+    tracing = run(Tracer(Tracing(mode="off"), tmp_path))
+
+    assert tracing.calls == [] and not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize("failed", (True, False), ids=("failure", "success"))
+def test_on_failure(tmp_path: pathlib.Path, failed: bool):
+    tracing = run(Tracer(Tracing(mode="on-failure", buffer=2), tmp_path), failed=failed)
+
+    assert tracing.calls[0] == "start" and tracing.calls[-1] == "stop"
+    assert len(list(tmp_path.glob("*.zip"))) == (2 if failed else 0)
+
+
+def test_on_failure_concurrent_pages(tmp_path: pathlib.Path):
+    tracing = run(Tracer(Tracing(mode="on-failure", buffer=4), tmp_path), pages=3, failed=True)
+
+    chunks = [call for call in tracing.calls if call.endswith("chunk")]
+
+    assert chunks == ["start_chunk", *["stop_chunk", "start_chunk"] * 16]
+    assert len(list(tmp_path.glob("*.zip"))) == 4
+
+
+def test_sampled(tmp_path: pathlib.Path):
+    tracer = Tracer(Tracing(mode="sampled", rate=3), tmp_path)
+
+    for _ in range(6):
+        run(tracer)
+
+    assert len(list(tmp_path.glob("*.zip"))) == 2
+
+
+def test_rotation(tmp_path: pathlib.Path):
+    for index in range(5):
+        tmp_path.joinpath(f"old-{index}.zip").write_bytes(b"")
+
+    run(Tracer(Tracing(mode="full", keep=3), tmp_path))
+
+    assert len(list(tmp_path.glob("*.zip"))) == 3
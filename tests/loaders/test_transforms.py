@@ -0,0 +1,69 @@
+# mypy: disable-error-code="no-untyped-def"
+
+import datetime
+import decimal
+
+import pytest
+
+from tmo.config import Load
+from tmo.loaders import transforms
+from tmo.web.routers.models.post import FillSubscriber, PostFilledBill
+
+
+def make_bill() -> PostFilledBill:
+    return PostFilledBill(
+        date=datetime.date(2024, 3, 1),
+        subscribers=[
+            FillSubscriber(name=name, number=number, phone=phone, line=0, insurance=0, usage=0, minutes=minutes)
+            for name, number, phone, minutes in (
+                ("Alice", "555-123-4567", 10, 1),
+                ("Bob", "555-987-6543", 20, 2),
+                ("Carol", "555-000-1111", 30, 3),
+            )
+        ],
+    )
+
+
+def values(bill: PostFilledBill, field: str) -> list[int | decimal.Decimal]:
+    return [getattr(subscriber, field) for subscriber in bill.subscribers]
+
+
+def test_swap():
+    swap = transforms.Swap.compile({"phone": {"5551234567": "555-987-6543"}, "minutes": {}})
+
+    assert swap.permutations == {"phone": {"5559876543": "5551234567", "5551234567": "5559876543"}}
+
+    [bill] = swap([make_bill()])
+
+    assert values(bill, "phone") == [20, 10, 30]
+    assert values(bill, "minutes") == [1, 2, 3]
+
+
+def test_swap_missing_subscriber():
+    [bill] = transforms.Swap.compile({"phone": {"555-123-4567": "555-999-9999"}})([make_bill()])
+
+    assert values(bill, "phone") == [10, 20, 30]
+
+
+def test_pipeline():
+    calls = []
+
+    @transforms.register("test-count")
+    def count(bills: list[PostFilledBill]) -> list[PostFilledBill]:
+        calls.append(len(bills))
+        return bills
+
+    settings = Load(swap={"phone": {"555-123-4567": "555-000-1111"}}, transforms=["test-count"])
+    pipeline = transforms.pipeline(settings)
+
+    assert pipeline is transforms.pipeline(settings)
+
+    bills = pipeline(make_bill() for _ in range(3))
+
+    assert calls == [3]
+    assert [values(bill, "phone") for bill in bills] == [[30, 20, 10]] * 3
+
+
+def test_pipeline_unknown_transform():
+    with pytest.raises(KeyError, match="Could not find a transform named 'missing'"):
+        transforms.pipeline(Load(transforms=["missing"]))
@@ -0,0 +1,64 @@
+# mypy: disable-error-code="no-untyped-def"
+
+import asyncio
+import datetime
+import json
+
+import httpx
+
+from tmo.loaders.upload import upload
+from tmo.web.routers.models.post import PostFilledBill
+
+BILLS = [PostFilledBill(date=datetime.date(2024, month, 1)) for month in range(1, 13)]
+
+
+def test_upload():
+    active, peak, seen = 0, 0, []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal active, peak
+
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+        seen.append(request.url.params["upsert"])
+
+        return httpx.Response(200, json={})
+
+    report = asyncio.run(
+        upload(BILLS, upsert=True, base_url="http://test", concurrency=3, transport=httpx.MockTransport(handler))
+    )
+
+    assert (report.sent, report.retried, report.failed) == (12, 0, [])
+    assert report.rate > 0
+    assert peak == 3 and seen == ["true"] * 12
+
+
+def test_upload_retries():
+    attempts: dict[str, int] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        date = json.loads(request.content)["date"]
+        attempts[date] = attempts.get(date, 0) + 1
+
+        if date == "2024-01-01":
+            return httpx.Response(409, json={"detail": "exists"})
+
+        if date == "2024-02-01" and attempts[date] == 1:
+            raise httpx.ConnectError("refused")
+
+        if date == "2024-03-01":
+            return httpx.Response(503)
+
+        return httpx.Response(200, json={})
+
+    report = asyncio.run(
+        upload(BILLS, base_url="http://test", retries=2, backoff=0, transport=httpx.MockTransport(handler))
+    )
+
+    assert report.sent == 10
+    assert report.failed == [datetime.date(2024, 1, 1), datetime.date(2024, 3, 1)]
+    assert report.retried == 3
+    assert attempts["2024-01-01"] == 1 and attempts["2024-02-01"] == 2 and attempts["2024-03-01"] == 3
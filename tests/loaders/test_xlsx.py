@@ -0,0 +1,90 @@
+# mypy: disable-error-code="no-untyped-def"
+
+import datetime
+import decimal
+import pathlib
+
+import openpyxl  # type: ignore[import-untyped]
+import pytest
+
+from tmo.loaders.convert import convert_directory
+from tmo.loaders.xlsx import parse_workbook
+
+CHARGES = [
+    ["555-123-4567", "Alice", None, 10.0, 20.004, 7, 0],
+    ["555-987-6543", "Bob", None, 0, 20, 0, 1.5],
+]
+USAGE = [["555-123-4567", 100, 200, 1.23456], ["555-987-6543", 5, 6, 0.5]]
+
+
+def write(path: pathlib.Path, layout: int) -> pathlib.Path:
+    workbook = openpyxl.Workbook()
+    charges = workbook.active
+    charges.title = "Charges"
+
+    for column, subscriber in enumerate(CHARGES, start=2):
+        values = [*subscriber, None, *USAGE[column - 2][1:]] if layout == 1 else subscriber
+
+        for row, value in enumerate(values, start=1):
+            charges.cell(row, column, value)
+
+    if layout == 2:
+        for row, usage in enumerate(USAGE, start=15):
+            for column, value in enumerate(usage, start=2):
+                charges.cell(row, column, value)
+
+    if layout == 3:
+        statistics = workbook.create_sheet("Statistics")
+        for usage in USAGE:
+            statistics.append(usage)
+
+    workbook.save(path)
+
+    return path
+
+
+@pytest.mark.parametrize(("layout", "date"), ((1, "2021.03.15"), (2, "2019.09.15"), (3, "2019.02.15")))
+def test_parse_workbook(tmp_path: pathlib.Path, layout: int, date: str):
+    bill = parse_workbook(write(tmp_path.joinpath(f"Bill {date}.xlsx"), layout))
+
+    assert bill is not None
+    assert bill.date == datetime.date(*map(int, date.split(".")))
+    assert bill.total == decimal.Decimal("58.50")
+
+    alice, bob = bill.subscribers
+
+    assert (alice.name, alice.number, alice.line, alice.total) == (
+        "Alice",
+        "555-123-4567",
+        decimal.Decimal("20.00"),
+        decimal.Decimal("37"),
+    )
+    assert (alice.minutes, alice.messages, alice.data) == (100, 200, decimal.Decimal("1.2346"))
+    assert (bob.minutes, bob.messages, bob.usage) == (5, 6, decimal.Decimal("1.50"))
+
+
+def test_parse_workbook_skipped(tmp_path: pathlib.Path):
+    assert parse_workbook(write(tmp_path.joinpath("Bill 2018.12.01.xlsx"), 3)) is None
+    assert parse_workbook(tmp_path.joinpath("Bill 2019.06.27.xlsx")) is None
+
+
+def test_convert_workbooks(tmp_path: pathlib.Path):
+    write(tmp_path.joinpath("Bill 2021.03.15.xlsx"), 1)
+    write(tmp_path.joinpath("Bill 2019.02.15.xlsx"), 3)
+    write(tmp_path.joinpath("Bill 2018.12.01.xlsx"), 3)
+    write(tmp_path.joinpath("Bill 2020.13.01.xlsx"), 1)
+
+    results = convert_directory(tmp_path, pattern="*.xlsx", workers=2, parse=parse_workbook)
+
+    assert [result.path.name for result in results] == [
+        "Bill 2018.12.01.xlsx",
+        "Bill 2019.02.15.xlsx",
+        "Bill 2020.13.01.xlsx",
+        "Bill 2021.03.15.xlsx",
+    ]
+
+    skipped, old, broken, new = results
+
+    assert skipped.bill is None and skipped.error is None
+    assert old.bill and new.bill and old.bill.total == new.bill.total
+    assert broken.bill is None and broken.error == "ValueError: month must be in 1..12"
@@ -0,0 +1,142 @@
+# mypy: disable-error-code="no-untyped-def"
+import asyncio
+import copy
+import datetime
+import json
+import typing
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from tmo.db.models.tables import Subscriber
+from tmo.loaders.upload import upload
+from tmo.web.routers.models.post import PostFilledBill
+
+pytestmark = [pytest.mark.usefixtures("insert_into_database")]
+
+
+@pytest.fixture
+def payload(database_values: dict[str, list[dict[str, typing.Any]]]) -> dict[str, typing.Any]:
+    subscribers = [Subscriber.model_validate(subscriber) for subscriber in database_values["subscriber"][:3]]
+
+    return {
+        "date": datetime.date(2100, 1, 1).isoformat(),
+        "total": 36.0,
+        "charges": [{"name": "taxes", "split": True, "total": 6.0}],
+        "subscribers": [
+            {"name": subscriber.name, "number": subscriber.number, "phone": 10.0} for subscriber in subscribers
+        ],
+    }
+
+
+def test_fill_upsert(client: TestClient, payload: dict[str, typing.Any]):
+    response = client.post("/api/fill", json=payload, params={"upsert": True})
+    assert response.status_code == 200
+
+    id = response.json()["id"]
+
+    response = client.post("/api/fill", json=payload, params={"upsert": True})
+    assert response.status_code == 200 and response.json()["id"] == id
+
+    payload["total"] = 41.0
+    payload["subscribers"][0]["phone"] = 15.0
+    response = client.post("/api/fill", json=payload, params={"upsert": True})
+    assert response.status_code == 200 and response.json() == {"id": id, "date": payload["date"], "total": 41.0}
+
+    details = client.get(f"/api/bill/{id}").json()
+    phones = sorted(subscriber["total"] for subscriber in details["subscribers"])
+    assert phones == [10.0, 10.0, 15.0]
+
+
+def test_fill_normalized_numbers(client: TestClient, payload: dict[str, typing.Any]):
+    payload["date"] = "2105-01-01"
+    payload["subscribers"][0]["number"] = payload["subscribers"][0]["number"].replace("-", "")
+
+    response = client.post("/api/fill", json=payload)
+    assert response.status_code == 200
+
+    bill = client.get(f"/api/bill/{response.json()['id']}").json()
+    assert len(bill["subscribers"]) == 3
+
+
+def test_fill_conflict(client: TestClient, payload: dict[str, typing.Any]):
+    payload["date"] = "2104-01-01"
+
+    assert client.post("/api/fill", json=payload).status_code == 200
+
+    response = client.post("/api/fill", json=payload)
+    assert response.status_code == 409 and "already exists" in response.json()["detail"]
+
+    # An existing bill isn't retried by the uploader
+    transport = httpx.ASGITransport(app=client.app)
+    report = asyncio.run(upload([PostFilledBill.model_validate(payload)], base_url="http://test", transport=transport))
+
+    assert (report.sent, report.retried, report.failed) == (0, 0, [datetime.date(2104, 1, 1)])
+
+
+def batch(payload: dict[str, typing.Any], year: int, count: int) -> list[dict[str, typing.Any]]:
+    return [
+        {**copy.deepcopy(payload), "date": datetime.date(year, month, 1).isoformat()} for month in range(1, count + 1)
+    ]
+
+
+@pytest.mark.parametrize("ndjson", (True, False), ids=("ndjson", "json"))
+def test_fill_batch(client: TestClient, payload: dict[str, typing.Any], ndjson: bool):
+    bills = batch(payload, 2101 + ndjson, 5)
+    body = "\n".join(map(json.dumps, bills)) if ndjson else json.dumps(bills)
+
+    response = client.post("/api/fill/batch", content=iter([body[:50].encode(), body[50:].encode()]))
+    statuses = [json.loads(line) for line in response.iter_lines()]
+
+    assert response.status_code == 200 and response.headers["content-type"] == "application/x-ndjson"
+    assert [(status["index"], status["status"]) for status in statuses] == [(index, "created") for index in range(5)]
+
+    bill = client.get(f"/api/bill/{statuses[2]['id']}").json()
+    assert bill["date"] == bills[2]["date"] and len(bill["subscribers"]) == 3
+
+
+def test_fill_batch_statuses(client: TestClient, payload: dict[str, typing.Any]):
+    bills = batch(payload, 2103, 4)
+    client.post("/api/fill/batch", content=json.dumps(bills[:1]))
+
+    bills[1]["subscribers"][0]["number"] = "000-000-0000"
+    bills[2] = {"date": "not a date"}
+    body = "\n".join(map(json.dumps, [bills[0], *bills])) + "\n{"
+
+    response = client.post("/api/fill/batch", content=body, params={"chunk_size": 2})
+    statuses = [json.loads(line) for line in response.iter_lines()]
+
+    assert [status["status"] for status in statuses] == ["failed", "failed", "failed", "failed", "created", "failed"]
+    assert "already a bill" in statuses[0]["error"] and "Could not find" in statuses[2]["error"]
+    assert "Invalid bill" in statuses[3]["error"] and "Invalid JSON" in statuses[5]["error"]
+
+    bills[0]["subscribers"][0]["phone"] = 15.0
+    response = client.post("/api/fill/batch", content=json.dumps([bills[0], bills[3]]), params={"upsert": True})
+
+    assert [json.loads(line)["status"] for line in response.iter_lines()] == ["updated", "unchanged"]
+
+
+def test_fill_batch_upsert_repeated_date(client: TestClient, payload: dict[str, typing.Any]):
+    first = {**copy.deepcopy(payload), "date": "2106-01-01"}
+    second = {**copy.deepcopy(first), "total": 6.0, "subscribers": copy.deepcopy(first["subscribers"][:1])}
+    third = {
+        **copy.deepcopy(first),
+        "total": 2.0,
+        "charges": [],
+        "subscribers": copy.deepcopy(first["subscribers"][1:2]),
+    }
+    second["subscribers"][0]["phone"] = third["subscribers"][0]["phone"] = 5.0
+
+    # Each entry (the third in another chunk) is merged into the bill stored for the ones before it
+    response = client.post(
+        "/api/fill/batch", content=json.dumps([first, second, third]), params={"upsert": True, "chunk_size": 2}
+    )
+    statuses = [json.loads(line) for line in response.iter_lines()]
+
+    assert [status["status"] for status in statuses] == ["created", "updated", "updated"]
+
+    bill = client.get(f"/api/bill/{statuses[0]['id']}").json()
+
+    assert bill["total"] == 44.0 and sorted(subscriber["total"] for subscriber in bill["subscribers"]) == [10, 15, 15]
+    assert [(charge["name"], charge["total"]) for charge in bill["charges"]] == [("taxes", 12.0)]
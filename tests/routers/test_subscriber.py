@@ -73,7 +73,7 @@ def test_get_subscriber_missing(client: TestClient, database_values: dict[str, l
     assert response.status_code == 404
 
 
-@pytest.mark.parametrize("key", ("name", "number", "both", "neither"))
+@pytest.mark.parametrize("key", ("name", "number", "normalized", "both", "neither"))
 def test_get_subscriber_lookup(key: str, client: TestClient, subscriber: Subscriber):
     if key in ("both", "neither"):
         response = client.get(
@@ -84,11 +84,22 @@ def test_get_subscriber_lookup(key: str, client: TestClient, subscriber: Subscri
             "detail": "Exactly one of name or number must be provided"
         }
 
+    elif key == "normalized":
+        response = client.get("/api/subscriber/lookup", params={"number": subscriber.number.replace("-", "")})
+        assert response.status_code == 200 and response.json()["id"] == subscriber.id
+
     else:
         response = client.get("/api/subscriber/lookup", params={key: getattr(subscriber, key)})
         assert response.status_code == 200 and response.json()["id"] == subscriber.id
 
 
+def test_post_subscriber_normalized(client: TestClient, subscriber: Subscriber):
+    number = subscriber.number.replace("-", "")
+
+    response = client.post("/api/subscriber", json={"name": secrets.token_hex(), "number": number})
+    assert response.status_code == 409 and f"(ID={subscriber.id})" in response.json()["detail"]
+
+
 @pytest.mark.parametrize("state", (-1, 0, 1), ids=("exists", "invalid number", "success"))
 def test_post_subscriber(state: int, client: TestClient, subscriber: Subscriber):
     if state == -1:
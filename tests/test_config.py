@@ -128,3 +128,17 @@ class TestFrontend:
 
         with pytest.raises(ValueError):
             Frontend.model_validate({"dependents": dependents})
+
+
+@pytest.mark.parametrize(
+    ("api", "url"),
+    [
+        ({}, "http://127.0.0.1:8000"),
+        ({"host": "10.0.0.2", "port": 9000}, "http://10.0.0.2:9000"),
+        ({"host": "::1"}, "http://[::1]:8000"),
+        ({"host": "::"}, "http://[::1]:8000"),
+        ({"url": "https://bills.example.com/"}, "https://bills.example.com"),
+    ],
+)
+def test_api_base_url(api: dict[str, typing.Any], url: str):
+    assert Config(api=api).api.base_url == url  # type: ignore[arg-type]
@@ -1,5 +1,9 @@
 # mypy: disable-error-code="no-untyped-def"
 
+import asyncio
+
+from sqlmodel import text
+
 import tmo.web.dependencies
 from tmo import config
 
@@ -12,3 +16,28 @@ def test_initialization():
         engine = next(tmo.web.dependencies.get_session())
 
     assert engine is not None
+
+
+def test_async_initialization(tmp_path):
+    assert tmo.web.dependencies.async_engine is None
+    database = {"dialect": "sqlite", "path": tmp_path.joinpath("tmo.db")}
+
+    async def tables() -> list[str]:
+        sessions = tmo.web.dependencies.get_async_session()
+        session = await anext(sessions)
+
+        query = text("SELECT name FROM sqlite_master WHERE type = 'table'")
+        result = await session.exec(query)  # type: ignore[call-overload]
+        names = [name for (name,) in result]
+
+        await sessions.aclose()
+        assert tmo.web.dependencies.async_engine is not None
+
+        await tmo.web.dependencies.dispose_async_engine()
+
+        return names
+
+    with config.patch(database=database):
+        assert "bill" in asyncio.run(tables())
+
+    assert tmo.web.dependencies.async_engine is None
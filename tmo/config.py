@@ -1,9 +1,10 @@
 import contextlib
+import datetime
 import ipaddress
 import pathlib
 import typing
 
-from pydantic import BaseModel, Field, IPvAnyAddress, field_validator
+from pydantic import BaseModel, Field, IPvAnyAddress, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 T = dict[str, "T"]
@@ -40,6 +41,7 @@ class Load(BaseModel, validate_assignment=True):
     numbers: dict[str, str] = Field(default_factory=dict)
     names: dict[typing.Literal["default"] | str, str] = Field(default_factory=dict)
     swap: dict[str, dict[str, str]] = Field(default_factory=dict)
+    transforms: list[str] = Field(default_factory=list)
 
     @field_validator("names", mode="before")
     @classmethod
@@ -80,6 +82,79 @@ class Api(BaseModel, validate_assignment=True):
     debug: bool = False
     port: int = 8000
     host: IPvAnyAddress = Field(default=ipaddress.IPv4Address("0.0.0.0"))
+    url: str | None = None
+
+    @property
+    def base_url(self) -> str:
+        """The URL the loaders send bills to: `url` if set, otherwise the local server at `host`/`port`."""
+        if self.url:
+            return self.url.rstrip("/")
+
+        host = str(self.host)
+
+        if self.host.is_unspecified:
+            host = "::1" if self.host.version == 6 else "127.0.0.1"
+
+        return f"http://{f'[{host}]' if self.host.version == 6 else host}:{self.port}"
+
+
+class Delay(BaseModel, validate_assignment=True):
+    distribution: typing.Literal["fixed", "uniform", "normal"] = "uniform"
+    low: float = Field(default=0.0, ge=0)
+    high: float = Field(default=0.0, ge=0)
+
+    @model_validator(mode="before")
+    @classmethod
+    def default_high(cls, values: typing.Any) -> typing.Any:
+        if isinstance(values, dict) and "low" in values and "high" not in values:
+            return {**values, "high": values["low"]}
+
+        return values
+
+    @model_validator(mode="after")
+    def check_bounds(self) -> typing.Self:
+        if self.high < self.low:
+            raise ValueError("The upper bound of a delay cannot be less than the lower bound")
+
+        return self
+
+
+class Pacing(BaseModel, validate_assignment=True):
+    click: Delay = Field(default_factory=lambda: Delay(low=0.1, high=3.0))
+    keystroke: Delay = Field(default_factory=lambda: Delay(low=0.1, high=0.15))
+    navigation: Delay = Field(default_factory=lambda: Delay(low=0.5, high=1.5))
+
+
+class Timeouts(BaseModel, validate_assignment=True):
+    login: float = Field(default=15.0, gt=0)
+    probe: float = Field(default=10.0, gt=0)
+    dialog: float = Field(default=30.0, gt=0)
+    report: float = Field(default=300.0, gt=0)
+    download: float = Field(default=60.0, gt=0)
+
+    poll: float = Field(default=1.0, gt=0)
+    poll_max: float = Field(default=30.0, gt=0)
+
+
+class Storage(BaseModel, validate_assignment=True):
+    enabled: bool = True
+    lifetime: datetime.timedelta = datetime.timedelta(hours=12)
+
+
+class Blocking(BaseModel, validate_assignment=True):
+    enabled: bool = True
+    resource_types: list[str] = Field(
+        default_factory=lambda: ["image", "media", "font", "beacon", "ping", "texttrack", "manifest"]
+    )
+    allow: list[str] = Field(default_factory=lambda: ["t-mobile.com", "tmobile.com"])
+
+
+class Tracing(BaseModel, validate_assignment=True):
+    mode: typing.Literal["off", "on-failure", "sampled", "full"] = "on-failure"
+    rate: int = Field(default=10, ge=1)
+    buffer: int = Field(default=3, ge=1)
+    keep: int = Field(default=10, ge=1)
+    directory: pathlib.Path | None = None
 
 
 class Fetch(BaseModel, validate_assignment=True):
@@ -87,6 +162,15 @@ class Fetch(BaseModel, validate_assignment=True):
     password: str
     totp_secret: str = ""
 
+    cache: pathlib.Path = pathlib.Path(".tmo")
+    metrics: pathlib.Path | None = None
+
+    pacing: Pacing = Field(default_factory=Pacing)
+    storage: Storage = Field(default_factory=Storage)
+    timeouts: Timeouts = Field(default_factory=Timeouts)
+    tracing: Tracing = Field(default_factory=Tracing)
+    blocking: Blocking = Field(default_factory=Blocking)
+
 
 class Config(BaseSettings):
     model_config = SettingsConfigDict(env_nested_delimiter="__", env_prefix="TMO_")
@@ -3,6 +3,7 @@ import sys
 import typing
 
 from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlmodel import SQLModel
 
 from ... import config
@@ -15,15 +16,32 @@ from ._sqlite import init as _init_sqlite
 logging.basicConfig()
 
 
-def start_engine(connect_args: dict[str, typing.Any] | None = None) -> Engine:
+@typing.overload
+def start_engine(
+    connect_args: dict[str, typing.Any] | None = None, *, asynchronous: typing.Literal[False] = False
+) -> Engine: ...
+
+
+@typing.overload
+def start_engine(
+    connect_args: dict[str, typing.Any] | None = None, *, asynchronous: typing.Literal[True]
+) -> AsyncEngine: ...
+
+
+def start_engine(
+    connect_args: dict[str, typing.Any] | None = None, *, asynchronous: bool = False
+) -> Engine | AsyncEngine:
+    """Build the engine for the configured database, creating the tables (unless it is `asynchronous`, in which case
+    they are created by awaiting `create_tables`).
+    """
     connect_args = connect_args or {}
 
     match config.database:
         case Sqlite() | Memory():
-            engine = _init_sqlite(config.database, connect_args=connect_args)
+            engine = _init_sqlite(config.database, connect_args=connect_args, asynchronous=asynchronous)
 
         case Postgres():
-            engine = _init_postgres(config.database, connect_args=connect_args)
+            engine = _init_postgres(config.database, connect_args=connect_args, asynchronous=asynchronous)
 
         case _:
             logging.getLogger("uvicorn.error").error("Could not match the database type: %s", type(config.database))
@@ -35,9 +53,17 @@ def start_engine(connect_args: dict[str, typing.Any] | None = None) -> Engine:
         logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
         attach_handler()
 
+    if isinstance(engine, AsyncEngine):
+        return engine
+
     SQLModel.metadata.create_all(engine)
 
     return engine
 
 
+async def create_tables(engine: AsyncEngine) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+
+
 __all__ = ["Bill", "BillSubscriberLink", "Charge", "Detail", "Subscriber"]
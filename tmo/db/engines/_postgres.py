@@ -1,14 +1,18 @@
 import typing
 
 from sqlalchemy import URL, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import create_engine
 
 from ...config import Postgres
 
 
-def init(config: Postgres, connect_args: dict[str, typing.Any] | None = None) -> Engine:
+def init(
+    config: Postgres, connect_args: dict[str, typing.Any] | None = None, asynchronous: bool = False
+) -> Engine | AsyncEngine:
     connect_args = connect_args or {}
 
+    # psycopg (3) is both the sync and the async driver
     url = URL.create(
         "postgresql+psycopg",
         username=config.username,
@@ -18,6 +22,9 @@ def init(config: Postgres, connect_args: dict[str, typing.Any] | None = None) ->
         database=config.database,
     )
 
+    if asynchronous:
+        return create_async_engine(url, connect_args=connect_args)
+
     engine = create_engine(url, connect_args=connect_args)
 
     return engine
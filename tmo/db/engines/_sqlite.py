@@ -2,16 +2,19 @@ import pathlib
 import typing
 
 from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import create_engine
 
 from ...config import Memory, Sqlite
 
 
-def init(config: Sqlite | Memory, connect_args: dict[str, typing.Any] | None = None) -> Engine:
+def init(
+    config: Sqlite | Memory, connect_args: dict[str, typing.Any] | None = None, asynchronous: bool = False
+) -> Engine | AsyncEngine:
     connect_args = connect_args or {}
     pool = connect_args.pop("pool", None)
 
-    url = "sqlite://"
+    url = "sqlite+aiosqlite://" if asynchronous else "sqlite://"
 
     if config.path:
         path = pathlib.Path.cwd().joinpath(config.path)
@@ -21,6 +24,9 @@ def init(config: Sqlite | Memory, connect_args: dict[str, typing.Any] | None = N
 
         url = f"{url}/{path.resolve()}"
 
+    if asynchronous:
+        return create_async_engine(url, connect_args=connect_args, poolclass=pool)
+
     engine = create_engine(url, connect_args=connect_args, poolclass=pool)
 
     return engine
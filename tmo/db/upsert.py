@@ -0,0 +1,206 @@
+import collections.abc
+import dataclasses
+import datetime
+import decimal
+import typing
+
+import sqlalchemy
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import col
+
+from .models import Bill, BillSubscriberLink, Charge, Detail, Subscriber
+
+if typing.TYPE_CHECKING:
+    from ..web.routers.models.post import PostFilledBill
+
+DETAIL_FIELDS = ("phone", "line", "insurance", "usage", "minutes", "messages", "data", "total")
+CHARGE_FIELDS = ("split", "total")
+
+
+@dataclasses.dataclass
+class Changes:
+    bills: int = 0
+    subscribers: int = 0
+    details: int = 0
+    charges: int = 0
+    deleted: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return any(dataclasses.astuple(self))
+
+    def __iadd__(self, other: "Changes") -> typing.Self:
+        for field in dataclasses.fields(self):
+            setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+
+        return self
+
+
+def insert(connection: sqlalchemy.Connection, table: type[typing.Any]) -> postgresql.Insert | sqlite.Insert:
+    match connection.dialect.name:
+        case "postgresql":
+            return postgresql.insert(table)
+
+        case "sqlite":
+            return sqlite.insert(table)
+
+    raise NotImplementedError(f"Upserts are not supported for the {connection.dialect.name} dialect")
+
+
+def _differs(
+    table: type[typing.Any], fields: tuple[str, ...], stored: typing.Any, values: dict[str, typing.Any]
+) -> bool:
+    for field in fields:
+        old, new = getattr(stored, field), values[field]
+
+        if isinstance(new, decimal.Decimal):
+            scale = decimal.Decimal(1).scaleb(-(table.__table__.c[field].type.scale or 0))
+            old, new = decimal.Decimal(str(old)).quantize(scale), new.quantize(scale)
+
+        if old != new:
+            return True
+
+    return False
+
+
+def _stored(
+    connection: sqlalchemy.Connection, table: type[typing.Any], bill_id: int, key: str, fields: tuple[str, ...]
+) -> tuple[dict[typing.Any, typing.Any], list[int]]:
+    """The rows of `table` for the bill by `key`, and the ids of the later rows sharing a key with an earlier one.
+
+    A plain (not upserted) load keeps a row per entry when a file repeats a date, so a subscriber (or charge) can have
+    several rows; the first one is compared with the merged entry and the others are deleted.
+    """
+    query = select(col(table.id), col(getattr(table, key)), *(col(getattr(table, field)) for field in fields))
+    stored: dict[typing.Any, typing.Any] = {}
+    duplicates: list[int] = []
+
+    for row in connection.execute(query.where(col(table.bill_id) == bill_id).order_by(col(table.id))):
+        if getattr(row, key) in stored:
+            duplicates.append(row.id)
+
+        else:
+            stored[getattr(row, key)] = row
+
+    return stored, duplicates
+
+
+def upsert_subscribers(
+    connection: sqlalchemy.Connection, subscribers: collections.abc.Iterable[dict[str, str]]
+) -> tuple[dict[str, int], Changes]:
+    """Insert the subscribers whose number is new, and return the id of every one of them by number."""
+    rows = {row["number"]: row for row in subscribers}
+
+    if not rows:
+        return {}, Changes()
+
+    result = connection.execute(
+        insert(connection, Subscriber).on_conflict_do_nothing(index_elements=["number"]), list(rows.values())
+    )
+    ids = connection.execute(
+        select(col(Subscriber.number), col(Subscriber.id)).where(col(Subscriber.number).in_(rows))
+    ).tuples()
+
+    return dict(ids.all()), Changes(subscribers=max(result.rowcount, 0))
+
+
+def read_bill(connection: sqlalchemy.Connection, date: datetime.date) -> "PostFilledBill":
+    """The stored bill for `date`, for a later entry of the same date to be merged into (see `PostFilledBill.merge`)."""
+    from ..web.routers.models.post import FillSubscriber, PostCharge, PostFilledBill
+
+    bill_id, total = connection.execute(select(col(Bill.id), col(Bill.total)).where(col(Bill.date) == date)).one()
+
+    details = connection.execute(
+        select(
+            col(Subscriber.name),
+            col(Subscriber.number),
+            col(Subscriber.format),
+            *(col(getattr(Detail, field)) for field in DETAIL_FIELDS),
+        )
+        .join(Subscriber, col(Subscriber.id) == col(Detail.subscriber_id))
+        .where(col(Detail.bill_id) == bill_id)
+    )
+    charges = connection.execute(
+        select(col(Charge.name), *(col(getattr(Charge, field)) for field in CHARGE_FIELDS)).where(
+            col(Charge.bill_id) == bill_id
+        )
+    )
+
+    return PostFilledBill(
+        date=date,
+        total=total,
+        subscribers=[FillSubscriber.model_validate(row) for row in details.mappings()],
+        charges=[PostCharge.model_validate(row) for row in charges.mappings()],
+    )
+
+
+def upsert_bill(
+    connection: sqlalchemy.Connection,
+    bill: "PostFilledBill",
+    subscribers: collections.abc.Mapping[str, int],
+    total: decimal.Decimal | None = None,
+) -> tuple[int, Changes]:
+    """Make the stored bill for `bill.date` match `bill`, writing only the rows that differ.
+
+    The bill is upserted on its (unique) date; its details (by subscriber) and charges (by name) are compared with
+    the stored rows, so that only the new or changed ones are written and the ones no longer present are deleted.
+    `subscribers` maps each subscriber number in the bill to its id, and `total` overrides `bill.total`.
+    """
+    changes = Changes()
+
+    statement = insert(connection, Bill).values(date=bill.date, total=bill.total if total is None else total)
+    statement = statement.on_conflict_do_update(
+        index_elements=["date"],
+        set_={"total": statement.excluded.total},
+        where=col(Bill.total) != statement.excluded.total,
+    )
+    changes.bills = max(connection.execute(statement).rowcount, 0)
+
+    bill_id = connection.execute(select(col(Bill.id)).where(col(Bill.date) == bill.date)).scalar_one()
+
+    details = {
+        subscribers[data.number]: {field: getattr(data, field) for field in DETAIL_FIELDS} for data in bill.subscribers
+    }
+    charges = {charge.name: {field: getattr(charge, field) for field in CHARGE_FIELDS} for charge in bill.charges}
+
+    for table, incoming, key, fields, counter in (
+        (Detail, details, "subscriber_id", DETAIL_FIELDS, "details"),
+        (Charge, charges, "name", CHARGE_FIELDS, "charges"),
+    ):
+        stored, duplicates = _stored(connection, table, bill_id, key, fields)
+
+        new = [{**values, key: name, "bill_id": bill_id} for name, values in incoming.items() if name not in stored]
+        changed = [
+            {**values, "row_id": stored[name].id}
+            for name, values in incoming.items()
+            if name in stored and _differs(table, fields, stored[name], values)
+        ]
+        removed = [row.id for name, row in stored.items() if name not in incoming] + duplicates
+
+        if new:
+            connection.execute(sqlalchemy.insert(table), new)
+
+        if changed:
+            connection.execute(update(table).where(col(table.id) == bindparam("row_id")), changed)
+
+        if removed:
+            connection.execute(delete(table).where(col(table.id).in_(removed)))
+
+        setattr(changes, counter, len(new) + len(changed))
+        changes.deleted += len(removed)
+
+    if details:
+        connection.execute(
+            insert(connection, BillSubscriberLink).on_conflict_do_nothing(),
+            [{"bill_id": bill_id, "subscriber_id": subscriber_id} for subscriber_id in details],
+        )
+
+    connection.execute(
+        delete(BillSubscriberLink).where(
+            col(BillSubscriberLink.bill_id) == bill_id,
+            col(BillSubscriberLink.subscriber_id).not_in(details),
+        )
+    )
+
+    return bill_id, changes
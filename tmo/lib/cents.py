@@ -0,0 +1,45 @@
+import decimal
+import re
+
+_AMOUNT = re.compile(r"(?P<sign>-?)(?P<whole>\d*)(?:\.(?P<fraction>\d*))?")
+_CENT = decimal.Decimal("0.01")
+
+
+def parse(text: str) -> int:
+    """Parse an amount like `"$1,234.5"` or `"-0.25"` into cents."""
+    amount = text.strip().replace("$", "").replace(",", "")
+    match = _AMOUNT.fullmatch(amount)
+
+    if not match or not (match["whole"] or match["fraction"]):
+        raise ValueError(f"Invalid amount: {text!r}")
+
+    fraction = match["fraction"] or ""
+
+    if len(fraction) > 2:
+        return from_decimal(decimal.Decimal(amount))
+
+    cents = int(match["whole"] or 0) * 100 + int(fraction.ljust(2, "0"))
+
+    return -cents if match["sign"] else cents
+
+
+def from_decimal(value: decimal.Decimal) -> int:
+    """Convert to cents, rounding anything finer than a cent half to even."""
+    return int(value.quantize(_CENT, rounding=decimal.ROUND_HALF_EVEN).scaleb(2))
+
+
+def to_decimal(cents: int) -> decimal.Decimal:
+    return decimal.Decimal(cents).scaleb(-2)
+
+
+def split(cents: int, parts: int) -> list[int]:
+    """Split `cents` into `parts` shares that always add back up to `cents`.
+
+    The leftover cents are handed out one at a time to the first shares, so the result only depends on the order.
+    """
+    if parts <= 0:
+        return []
+
+    share, remainder = divmod(cents, parts)
+
+    return [share + 1] * remainder + [share] * (parts - remainder)
@@ -0,0 +1,63 @@
+import collections.abc
+import typing
+
+SEPARATORS = "-. ()"
+
+_SEPARATORS = str.maketrans("", "", SEPARATORS)
+
+
+def normalize_number(number: str) -> str:
+    return number.translate(_SEPARATORS)
+
+
+class Named(typing.Protocol):
+    @property
+    def name(self) -> str: ...
+
+    @property
+    def number(self) -> str: ...
+
+
+class Entry(typing.NamedTuple):
+    number: str
+    name: str
+
+
+class SubscriberIndex[T: Named]:
+    """Lookup table for subscribers by (normalized) phone number or by name.
+
+    Built once from any collection of objects with a `name` and a `number`. When several subscribers share a key, the
+    first one wins, matching the linear scans this replaces.
+    """
+
+    def __init__(self, subscribers: collections.abc.Iterable[T]) -> None:
+        self._numbers: dict[str, T] = {}
+        self._names: dict[str, T] = {}
+
+        for subscriber in subscribers:
+            self._numbers.setdefault(normalize_number(subscriber.number), subscriber)
+            self._names.setdefault(subscriber.name, subscriber)
+
+    @classmethod
+    def from_numbers(cls, numbers: collections.abc.Mapping[str, str]) -> "SubscriberIndex[Entry]":
+        return SubscriberIndex(Entry(number, name) for number, name in numbers.items())
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def __contains__(self, number: str) -> bool:
+        return normalize_number(number) in self._numbers
+
+    def get(self, number: str) -> T | None:
+        return self._numbers.get(normalize_number(number))
+
+    def lookup(self, *, name: str = "", number: str = "") -> T:
+        if name and number or (name == "" and number == ""):
+            raise ValueError("Must supply exactly one of name or number, but not both.")
+
+        subscriber = self._names.get(name) if name else self.get(number)
+
+        if subscriber is None:
+            raise LookupError(f"Could not find the user: {name if name else number}")
+
+        return subscriber
@@ -0,0 +1,95 @@
+import decimal
+import json
+import typing
+
+_SEPARATORS = frozenset(" \t\r\n,")
+
+
+class RecordDecoder:
+    """Incrementally decode the values of a JSON array (or of NDJSON) from text fed in arbitrary chunks.
+
+    The format is picked from the first character that isn't whitespace. While a value spans several chunks, decoding
+    is only retried once the buffer has doubled, so that a large value isn't re-parsed for every chunk. Floats are
+    decoded as `decimal.Decimal`.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder(parse_float=decimal.Decimal)
+        self._buffer = ""
+        self._retry = 0
+
+        self.array: bool | None = None
+        self.ended = False
+
+    def feed(self, text: str) -> list[typing.Any]:
+        self._buffer += text
+
+        if len(self._buffer) < self._retry:
+            return []
+
+        return self._drain(final=False)
+
+    def close(self) -> list[typing.Any]:
+        """Decode what is left, raising a `json.JSONDecodeError` if the input was cut off."""
+        values = self._drain(final=True)
+
+        if self.array and not self.ended:
+            raise json.JSONDecodeError("Unterminated array", self._buffer, len(self._buffer))
+
+        return values
+
+    def _drain(self, final: bool) -> list[typing.Any]:
+        buffer, position, values = self._buffer, 0, []
+        self._retry = 0
+
+        while True:
+            while position < len(buffer) and buffer[position] in _SEPARATORS:
+                position += 1
+
+            if position == len(buffer):
+                break
+
+            if self.array is None:
+                self.array = buffer[position] == "["
+                position += self.array
+                continue
+
+            if self.ended:
+                raise json.JSONDecodeError("Extra data after the array", buffer, position)
+
+            if self.array and buffer[position] == "]":
+                self.ended = True
+                position += 1
+                continue
+
+            if not self.array:
+                end = buffer.find("\n", position)
+
+                if end == -1 and not final:
+                    break
+
+                end = len(buffer) if end == -1 else end
+                values.append(self._decoder.decode(buffer[position:end]))
+                position = end
+                continue
+
+            try:
+                value, end = self._decoder.raw_decode(buffer, position)
+
+                # A number at the very end of the buffer could still be missing some of its digits
+                if end == len(buffer) and not final:
+                    raise json.JSONDecodeError("Incomplete value", buffer, position)
+
+            except json.JSONDecodeError:
+                if final:
+                    raise
+
+                self._retry = 2 * (len(buffer) - position)
+                break
+
+            values.append(value)
+            position = end
+
+        self._buffer = buffer[position:]
+
+        return values
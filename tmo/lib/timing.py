@@ -0,0 +1,139 @@
+import contextlib
+import contextvars
+import dataclasses
+import datetime
+import functools
+import inspect
+import json
+import pathlib
+import time
+import typing
+
+_current: contextvars.ContextVar["Run | None"] = contextvars.ContextVar("run", default=None)
+
+
+@dataclasses.dataclass
+class Span:
+    name: str
+    start: float
+    duration: float = 0.0
+    ok: bool = True
+
+
+@dataclasses.dataclass
+class Run:
+    """A timed pipeline run, made up of the spans recorded while it is the active run."""
+
+    name: str
+    started: datetime.datetime = dataclasses.field(default_factory=lambda: datetime.datetime.now(datetime.UTC))
+    spans: list[Span] = dataclasses.field(default_factory=list)
+    meta: dict[str, typing.Any] = dataclasses.field(default_factory=dict)
+
+    ok: bool = True
+    duration: float = 0.0
+
+    _origin: float = dataclasses.field(default_factory=time.perf_counter, repr=False)
+
+    @contextlib.contextmanager
+    def span(self, name: str) -> typing.Generator[Span, None, None]:
+        span = Span(name=name, start=time.perf_counter() - self._origin)
+        self.spans.append(span)
+
+        try:
+            yield span
+
+        except BaseException:
+            span.ok = False
+            raise
+
+        finally:
+            span.duration = time.perf_counter() - self._origin - span.start
+
+    def totals(self) -> dict[str, float]:
+        totals: dict[str, float] = {}
+
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration
+
+        return totals
+
+    def record(self) -> dict[str, typing.Any]:
+        return {
+            "name": self.name,
+            "started": self.started.isoformat(),
+            "duration": self.duration,
+            "ok": self.ok,
+            "totals": self.totals(),
+            "spans": [dataclasses.asdict(span) for span in self.spans],
+            "meta": self.meta,
+        }
+
+    def write(self, directory: pathlib.Path, metrics: pathlib.Path | None = None) -> pathlib.Path:
+        """Write the run record as JSON into `directory`, and append it as a single line to `metrics` (if set)."""
+        record = self.record()
+
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory.joinpath(f"{self.name}-{self.started:%Y%m%dT%H%M%S.%f}.json")
+        path.write_text(json.dumps(record, indent=2), encoding="utf8")
+
+        if metrics:
+            metrics.parent.mkdir(parents=True, exist_ok=True)
+
+            with metrics.open("a", encoding="utf8") as stream:
+                stream.write(json.dumps(record) + "\n")
+
+        return path
+
+
+@contextlib.contextmanager
+def run(name: str) -> typing.Generator[Run, None, None]:
+    """Make a new `Run` the active run for the current context (including tasks created within it)."""
+    current = Run(name=name)
+    token = _current.set(current)
+
+    try:
+        yield current
+
+    except BaseException:
+        current.ok = False
+        raise
+
+    finally:
+        current.duration = time.perf_counter() - current._origin
+        _current.reset(token)
+
+
+@contextlib.contextmanager
+def span(name: str) -> typing.Generator[Span | None, None, None]:
+    """Time the block as a span of the active run. Does nothing when there isn't an active run."""
+    current = _current.get()
+
+    if current is None:
+        yield None
+        return
+
+    with current.span(name) as _span:
+        yield _span
+
+
+def timed[**P, T](name: str) -> typing.Callable[[typing.Callable[P, T]], typing.Callable[P, T]]:
+    """Decorator recording every call of the (sync or async) function as a span named `name`."""
+
+    def decorator(func: typing.Callable[P, T]) -> typing.Callable[P, T]:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_inner(*args: P.args, **kwargs: P.kwargs) -> typing.Any:
+                with span(name):
+                    return await func(*args, **kwargs)
+
+            return typing.cast(typing.Callable[P, T], async_inner)
+
+        @functools.wraps(func)
+        def inner(*args: P.args, **kwargs: P.kwargs) -> T:
+            with span(name):
+                return func(*args, **kwargs)
+
+        return inner
+
+    return decorator
@@ -0,0 +1,69 @@
+import collections
+import dataclasses
+import logging
+import urllib.parse
+
+import playwright.async_api as playwright
+
+from ..config import Blocking
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class Blocker:
+    """Request interception profile that aborts non-essential resource types and any third-party domain.
+
+    A request is allowed through only when its resource type is not in `settings.resource_types` and its host is
+    one of (or a subdomain of) the `settings.allow` domains.
+    """
+
+    settings: Blocking = dataclasses.field(default_factory=Blocking)
+
+    blocked: collections.Counter[str] = dataclasses.field(default_factory=collections.Counter, init=False)
+    allowed: int = dataclasses.field(default=0, init=False)
+    transferred: int = dataclasses.field(default=0, init=False)
+
+    def is_allowed(self, request: playwright.Request) -> bool:
+        if request.resource_type in self.settings.resource_types:
+            return False
+
+        host = urllib.parse.urlsplit(request.url).hostname or ""
+
+        return any(host == domain or host.endswith(f".{domain}") for domain in self.settings.allow)
+
+    async def _route(self, route: playwright.Route) -> None:
+        request = route.request
+
+        if request.url.startswith(("data:", "blob:")) or self.is_allowed(request):
+            self.allowed += 1
+            await route.fallback()
+            return
+
+        self.blocked[request.resource_type] += 1
+        await route.abort("blockedbyclient")
+
+    async def _finished(self, request: playwright.Request) -> None:
+        try:
+            sizes = await request.sizes()
+
+        except playwright.Error:
+            return
+
+        self.transferred += sizes["responseHeadersSize"] + sizes["responseBodySize"]
+
+    async def attach(self, context: playwright.BrowserContext) -> None:
+        self.blocked.clear()
+        self.allowed = self.transferred = 0
+
+        await context.route("**/*", self._route)
+        context.on("requestfinished", self._finished)
+
+    def report(self) -> None:
+        logger.info(
+            "Blocked %d of %d requests (%s); %.1f KiB transferred for the rest",
+            self.blocked.total(),
+            self.blocked.total() + self.allowed,
+            ", ".join(f"{kind}: {count}" for kind, count in self.blocked.most_common()) or "none",
+            self.transferred / 1024,
+        )
@@ -1,18 +1,39 @@
+import collections
+import dataclasses
 import datetime
 import decimal
+import functools
+import hashlib
+import itertools
+import json
+import logging
 import pathlib
+import sys
+import time
+import typing
 
-import httpx
-import pydantic
-from sqlmodel import Session
+import sqlalchemy
+from sqlalchemy import bindparam, insert, select, update
+from sqlmodel import col
 
 from .. import config
+from ..config import Postgres
 from ..db.engines import start_engine
-from ..db.models import Bill, Charge, Detail, Subscriber
+from ..db.models import Bill, BillSubscriberLink, Charge, Detail, Subscriber
+from ..db.upsert import Changes, read_bill, upsert_bill, upsert_subscribers
+from ..lib.records import RecordDecoder
 from ..web.routers.models.post import PostFilledBill
 
-_bill_cache: dict[datetime.date, Bill] = {}
-_user_cache: dict[str, Subscriber] = {}
+try:
+    import resource
+
+except ImportError:
+    resource = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+_DETAIL_FIELDS = {"phone", "line", "insurance", "usage", "minutes", "messages", "data"}
+_END = object()
 
 
 class _NameMap:
@@ -23,57 +44,537 @@ class _NameMap:
         return self._names.get(key, self._names["default"])
 
 
-def write_db(path: pathlib.Path) -> None:
-    engine = start_engine()
+def _read_records(path: pathlib.Path, chunk_size: int = 1 << 16) -> typing.Iterator[typing.Any]:
+    """The decoded elements of a JSON array file, or the lines of an NDJSON file (which pydantic parses itself)."""
+    with path.open(encoding="utf8") as stream:
+        start = stream.read(chunk_size).lstrip()[:1]
+        stream.seek(0)
 
-    bills = pydantic.TypeAdapter(list[PostFilledBill]).validate_json(path.read_text(encoding="utf8"))
+        if start == "[":
+            decoder = RecordDecoder()
 
-    with Session(engine) as session:
-        for bill in bills:
-            _name_map = _NameMap(config.load.names)
-            _bill = _bill_cache.setdefault(bill.date, Bill(date=bill.date))
-
-            for charge in bill.charges:
-                _charge = Charge(name=charge.name, total=charge.total, split=charge.split, bill=_bill)
-                session.add(_charge)
-
-            for _data in bill.subscribers:
-                surname = _name_map[_data.name]
-                name = _data.name + " " + surname
-                user = _user_cache.setdefault(_data.number, Subscriber(name=name, number=_data.number))
-                user.bills.append(_bill)
-
-                detail = Detail(
-                    bill=_bill,
-                    subscriber=user,
-                    phone=_data.phone,
-                    line=_data.line,
-                    insurance=_data.insurance,
-                    usage=_data.usage,
-                    minutes=_data.minutes,
-                    messages=_data.messages,
-                    data=_data.data,
-                    total=sum([_data.line, _data.insurance, _data.usage, _data.phone]),
+            for chunk in iter(functools.partial(stream.read, chunk_size), ""):
+                yield from decoder.feed(chunk)
+
+            yield from decoder.close()
+            return
+
+        for line in stream:
+            if line.strip():
+                yield line
+
+
+def _validate(record: typing.Any) -> PostFilledBill:
+    if isinstance(record, str):
+        return PostFilledBill.model_validate_json(record)
+
+    return PostFilledBill.model_validate(record)
+
+
+def read_bills(path: pathlib.Path, chunk_size: int = 1 << 16) -> typing.Iterator[PostFilledBill]:
+    """Incrementally read and validate the bills in a JSON array (or NDJSON) file, one bill at a time."""
+    return map(_validate, _read_records(path, chunk_size))
+
+
+def _peak_memory() -> int | None:
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Reported in bytes on macOS, but in kibibytes everywhere else
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclasses.dataclass
+class Profile:
+    """Where the time of a bulk load went: reading the file, validating the bills, and writing them (with the number
+    of SQL statements sent). `peak` is the peak resident memory of the process, in bytes, where it can be measured.
+    """
+
+    records: int = 0
+    parse: float = 0.0
+    validate: float = 0.0
+    flush: float = 0.0
+    statements: int = 0
+    peak: int | None = None
+
+    @property
+    def duration(self) -> float:
+        return self.parse + self.validate + self.flush
+
+    @property
+    def rate(self) -> float:
+        return self.records / self.duration if self.duration else 0.0
+
+    def __str__(self) -> str:
+        lines = [f"{self.records} bills in {self.duration:.2f}s ({self.rate:.1f}/s)"]
+
+        for step in ("parse", "validate", "flush"):
+            seconds = getattr(self, step)
+            lines.append(f"  {step:<10}{seconds:>8.2f}s{seconds / (self.duration or 1):>8.1%}")
+
+        lines.append(f"  {self.statements} SQL statements")
+
+        if self.peak is not None:
+            lines.append(f"  {self.peak / (1 << 20):.1f} MiB peak memory")
+
+        return "\n".join(lines)
+
+
+class Identities[K](collections.OrderedDict[K, int]):
+    """A key -> id map in least recently used order, trimmed down to `maxsize` by `evict()` (and only then)."""
+
+    def __init__(self, maxsize: int) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key: K) -> int:
+        self.move_to_end(key)
+        return super().__getitem__(key)
+
+    def evict(self) -> None:
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+@dataclasses.dataclass
+class LoaderCache:
+    """The bill ids (by date) and subscriber ids (by number) used by a loader, scoped to its connection.
+
+    Both maps are preloaded with a single query each and bounded to `maxsize` entries, evicting the least recently used
+    ones after every chunk. Keys that aren't cached are looked up with one query for the whole batch.
+    """
+
+    connection: sqlalchemy.Connection
+    maxsize: int = 10_000
+
+    bills: Identities[datetime.date] = dataclasses.field(init=False)
+    subscribers: Identities[str] = dataclasses.field(init=False)
+
+    def __post_init__(self) -> None:
+        self.bills = Identities(self.maxsize)
+        self.subscribers = Identities(self.maxsize)
+
+    def preload(self) -> set[datetime.date]:
+        """Fill the cache, returning the date of every bill already in the database."""
+        bills = self.connection.execute(select(col(Bill.date), col(Bill.id)).order_by(col(Bill.id))).tuples().all()
+        subscribers = self.connection.execute(
+            select(col(Subscriber.number), col(Subscriber.id)).order_by(col(Subscriber.id)).limit(self.maxsize)
+        )
+
+        self.bills.update(bills)
+        self.subscribers.update(subscribers.tuples().all())
+        self.evict()
+
+        return {date for date, _ in bills}
+
+    def resolve_bills(self, dates: typing.Iterable[datetime.date]) -> None:
+        if missing := {date for date in dates if date not in self.bills}:
+            query = select(col(Bill.date), col(Bill.id)).where(col(Bill.date).in_(missing))
+            self.bills.update(self.connection.execute(query).tuples().all())
+
+    def resolve_subscribers(self, numbers: typing.Iterable[str]) -> None:
+        if missing := {number for number in numbers if number not in self.subscribers}:
+            query = select(col(Subscriber.number), col(Subscriber.id)).where(col(Subscriber.number).in_(missing))
+            self.subscribers.update(self.connection.execute(query).tuples().all())
+
+    def evict(self) -> None:
+        self.bills.evict()
+        self.subscribers.evict()
+
+
+def _total(bill: PostFilledBill) -> decimal.Decimal:
+    return sum(
+        (
+            *(charge.total for charge in bill.charges),
+            *(sub.phone + sub.line + sub.insurance + sub.usage for sub in bill.subscribers),
+        ),
+        start=decimal.Decimal(),
+    )
+
+
+def _encode(record: typing.Any) -> bytes:
+    return (record if isinstance(record, str) else json.dumps(record, default=str)).encode()
+
+
+@dataclasses.dataclass
+class Checkpoint:
+    """The number of records of a file committed to a database by a load that didn't finish, stored next to the file
+    (as `<name>.checkpoint`) and removed once a load of the file does finish.
+
+    Along with the count, the checkpoint keeps a hash of those records, so that it's ignored once they have changed
+    (while records after them can still be fixed before a rerun).
+    """
+
+    path: pathlib.Path
+    database: str
+    source: pathlib.Path
+
+    _digest: "hashlib._Hash" = dataclasses.field(default_factory=hashlib.sha256, init=False, repr=False)
+
+    @classmethod
+    def of(cls, path: pathlib.Path, connection: sqlalchemy.Connection) -> "Checkpoint":
+        database = connection.engine.url.render_as_string(hide_password=True)
+
+        return cls(path.with_name(f"{path.name}.checkpoint"), database, path)
+
+    def read(self) -> int:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf8"))
+
+        except FileNotFoundError:
+            return 0
+
+        # A checkpoint of a load into another database says nothing about this one
+        if data.get("database") != self.database:
+            return 0
+
+        records, digest = int(data["records"]), hashlib.sha256()
+
+        for record in itertools.islice(_read_records(self.source), records):
+            digest.update(_encode(record))
+
+        if digest.hexdigest() != data.get("digest"):
+            logger.warning("Ignoring the checkpoint of %s, as its first %d records have changed", self.source, records)
+            return 0
+
+        return records
+
+    def track(self, records: typing.Iterator[typing.Any]) -> typing.Iterator[typing.Any]:
+        """Hash the `records` of the file as they are read, for `write` to save with the count."""
+        for record in records:
+            self._digest.update(_encode(record))
+            yield record
+
+    def write(self, records: int) -> None:
+        data = {"database": self.database, "records": records, "digest": self._digest.hexdigest()}
+
+        temporary = self.path.with_name(f"{self.path.name}.tmp")
+        temporary.write_text(json.dumps(data), encoding="utf8")
+        temporary.replace(self.path)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+@dataclasses.dataclass
+class BulkLoader:
+    """Writes validated bills with batched Core inserts instead of the ORM unit of work.
+
+    Bills are buffered and written `batch_size` at a time: the new bills and subscribers are inserted and their ids
+    selected back in one query each, then the details, charges and bill/subscriber links with plain executemany
+    inserts. Bills that share a date (within the file) are merged into a single row, like the ORM loader did.
+
+    The transaction is committed every `chunk_size` bills. With `resume`, bills whose date was already in the database
+    are skipped. With a `checkpoint`, the number of records committed is saved after every chunk, so that a rerun
+    after a failure skips those records and picks up from the last committed chunk (even when a later record shares
+    the date of a committed one, and has to be merged into it). With `upsert`, every bill is instead compared with
+    the stored one and only the differences are written (see `tmo.db.upsert`), after merging the entries that share a
+    date. An entry for a date upserted by an earlier batch is merged into the stored bill, read back from the database,
+    so that it doesn't replace the earlier entries.
+    """
+
+    connection: sqlalchemy.Connection
+    batch_size: int = 500
+    chunk_size: int = 1000
+    resume: bool = True
+    upsert: bool = False
+    dry_run: bool = False
+    cache_size: int = 10_000
+    checkpoint: Checkpoint | None = None
+    names: _NameMap = dataclasses.field(default_factory=lambda: _NameMap(config.load.names))
+
+    cache: LoaderCache = dataclasses.field(init=False, repr=False)
+    links: dict[int, set[int]] = dataclasses.field(default_factory=dict, init=False, repr=False)
+    persisted: set[datetime.date] = dataclasses.field(default_factory=set, init=False, repr=False)
+    upserted: set[datetime.date] = dataclasses.field(default_factory=set, init=False, repr=False)
+    resumed: set[datetime.date] = dataclasses.field(default_factory=set, init=False, repr=False)
+
+    committed: int = dataclasses.field(default=0, init=False)
+    skipped: int = dataclasses.field(default=0, init=False)
+    position: int = dataclasses.field(default=0, init=False)
+    resume_from: int = dataclasses.field(default=0, init=False)
+    changes: Changes = dataclasses.field(default_factory=Changes, init=False)
+    profile: Profile = dataclasses.field(default_factory=Profile, init=False)
+
+    _pending: list[PostFilledBill] = dataclasses.field(default_factory=list, init=False, repr=False)
+    _uncommitted: int = dataclasses.field(default=0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.cache = LoaderCache(self.connection, maxsize=self.cache_size)
+
+    @property
+    def bills(self) -> Identities[datetime.date]:
+        return self.cache.bills
+
+    @property
+    def subscribers(self) -> Identities[str]:
+        return self.cache.subscribers
+
+    def preload(self) -> None:
+        self.persisted = self.cache.preload()
+
+        if self.checkpoint is not None:
+            if self.resume and not self.upsert:
+                self.resume_from = self.checkpoint.read()
+
+            else:
+                self.checkpoint.clear()
+
+        logger.info(
+            "Found %d bills and %d subscribers (resuming after %d records)",
+            len(self.persisted),
+            len(self.subscribers),
+            self.resume_from,
+        )
+
+    def add(self, bill: PostFilledBill) -> None:
+        self.position += 1
+
+        if self.position <= self.resume_from:
+            self.resumed.add(bill.date)
+            self.skipped += 1
+            return
+
+        if bill.date in self.persisted and bill.date not in self.resumed and not self.upsert:
+            if not self.resume:
+                raise ValueError(f"There is already a bill for {bill.date} (resume or upsert to skip or update it)")
+
+            self.skipped += 1
+            return
+
+        self._pending.append(bill)
+        self._uncommitted += 1
+
+        if self._uncommitted >= self.chunk_size:
+            self.commit()
+
+        elif len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def commit(self) -> None:
+        self.flush()
+
+        if not self.dry_run:
+            self.connection.commit()
+
+            if self.checkpoint is not None and not self.upsert:
+                self.checkpoint.write(self.position)
+
+        self.committed += self._uncommitted
+        self._uncommitted = 0
+        self.links.clear()
+        self.cache.evict()
+
+        logger.info("Committed %d bills (%d skipped)", self.committed, self.skipped)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+
+        if self.upsert:
+            self._upsert(pending)
+            return
+
+        totals: dict[datetime.date, decimal.Decimal] = collections.defaultdict(decimal.Decimal)
+
+        for bill in pending:
+            totals[bill.date] += _total(bill)
+
+        self._insert_bills(totals)
+        self._insert_subscribers(pending)
+
+        details: list[dict[str, typing.Any]] = []
+        charges: list[dict[str, typing.Any]] = []
+        links: list[dict[str, int]] = []
+
+        for bill in pending:
+            bill_id = self.bills[bill.date]
+            linked = self._linked(bill_id)
+
+            charges.extend(
+                {"name": charge.name, "split": charge.split, "total": charge.total, "bill_id": bill_id}
+                for charge in bill.charges
+            )
+
+            for data in bill.subscribers:
+                subscriber_id = self.subscribers[data.number]
+
+                details.append(
+                    {
+                        **data.model_dump(include=_DETAIL_FIELDS),
+                        "total": data.phone + data.line + data.insurance + data.usage,
+                        "bill_id": bill_id,
+                        "subscriber_id": subscriber_id,
+                    }
                 )
-                session.add(detail)
 
-            _bill.total = sum((item.total for item in _bill.details + _bill.charges), start=decimal.Decimal("0"))
+                if subscriber_id not in linked:
+                    linked.add(subscriber_id)
+                    links.append({"bill_id": bill_id, "subscriber_id": subscriber_id})
+
+        for table, rows in ((Charge, charges), (Detail, details), (BillSubscriberLink, links)):
+            if rows:
+                self.connection.execute(insert(table), rows)
+
+    def _upsert(self, bills: list[PostFilledBill]) -> None:
+        self.cache.resolve_subscribers(data.number for bill in bills for data in bill.subscribers)
+
+        ids, changes = upsert_subscribers(
+            self.connection,
+            (
+                {"name": f"{data.name} {self.names[data.name]}", "number": data.number, "format": data.format}
+                for bill in bills
+                for data in bill.subscribers
+                if data.number not in self.subscribers
+            ),
+        )
+        self.subscribers.update(ids)
+        self.changes += changes
+
+        entries: dict[datetime.date, list[PostFilledBill]] = collections.defaultdict(list)
+
+        for bill in bills:
+            entries[bill.date].append(bill)
+
+        for date, group in entries.items():
+            if date in self.upserted:
+                group.insert(0, read_bill(self.connection, date))
+
+            bill = PostFilledBill.merge(group)
+
+            self.bills[date], changes = upsert_bill(self.connection, bill, self.subscribers, total=_total(bill))
+            self.changes += changes
+            self.upserted.add(date)
+
+    def _insert_bills(self, totals: dict[datetime.date, decimal.Decimal]) -> None:
+        self.cache.resolve_bills(totals)
+
+        new = [date for date in totals if date not in self.bills]
+        merged = [{"bill_id": self.bills[date], "delta": totals[date]} for date in totals if date in self.bills]
+
+        if new:
+            # Without RETURNING: SQLite can't order a multi-row RETURNING, so it would send a statement per row
+            self.connection.execute(insert(Bill), [{"date": date, "total": totals[date]} for date in new])
+            self.cache.resolve_bills(new)
+
+            for date in new:
+                self.links[self.bills[date]] = set()
+
+        if merged:
+            self.connection.execute(
+                update(Bill).where(col(Bill.id) == bindparam("bill_id")).values(total=Bill.total + bindparam("delta")),
+                merged,
+            )
+
+    def _linked(self, bill_id: int) -> set[int]:
+        if bill_id not in self.links:
+            # A bill from an earlier (committed) chunk, being merged with another entry for the same date
+            query = select(col(BillSubscriberLink.subscriber_id)).where(col(BillSubscriberLink.bill_id) == bill_id)
+            self.links[bill_id] = set(self.connection.execute(query).scalars())
+
+        return self.links[bill_id]
+
+    def _insert_subscribers(self, bills: list[PostFilledBill]) -> None:
+        self.cache.resolve_subscribers(data.number for bill in bills for data in bill.subscribers)
+
+        new = {
+            data.number: {"name": f"{data.name} {self.names[data.name]}", "number": data.number, "format": data.format}
+            for bill in bills
+            for data in bill.subscribers
+            if data.number not in self.subscribers
+        }
+
+        if new:
+            self.connection.execute(insert(Subscriber), list(new.values()))
+            self.cache.resolve_subscribers(new)
+
+
+def _load(loader: BulkLoader, records: typing.Iterator[typing.Any]) -> None:
+    profile, clock = loader.profile, time.perf_counter
+
+    while True:
+        start = clock()
+        record = next(records, _END)
+        parsed = clock()
+        profile.parse += parsed - start
+
+        if record is _END:
+            break
+
+        bill = _validate(record)
+        validated = clock()
+        loader.add(bill)
+
+        profile.validate += validated - parsed
+        profile.flush += clock() - validated
+        profile.records += 1
+
+    start = clock()
+    loader.commit()
+    profile.flush += clock() - start
+
+
+def write_db(
+    path: pathlib.Path,
+    batch_size: int = 500,
+    chunk_size: int = 1000,
+    resume: bool = True,
+    upsert: bool = False,
+    dry_run: bool = False,
+    cache_size: int = 10_000,
+) -> BulkLoader:
+    """Load the bills in `path` into the database, profiling the load in `loader.profile`.
+
+    Until the load finishes, the records committed so far are checkpointed next to `path` for a rerun to resume from.
+    With `dry_run`, everything is written the same way but never committed (nor checkpointed), and rolled back at the
+    end.
+    """
+    engine = start_engine()
+    loader_class = BulkLoader
+
+    if isinstance(config.database, Postgres):
+        from .postgres import CopyLoader
+
+        loader_class = CopyLoader
+
+    with engine.connect() as connection:
+        loader = loader_class(
+            connection,
+            batch_size=batch_size,
+            chunk_size=chunk_size,
+            resume=resume,
+            upsert=upsert,
+            dry_run=dry_run,
+            cache_size=cache_size,
+            checkpoint=None if dry_run else Checkpoint.of(path, connection),
+        )
+
+        def count(*_: typing.Any) -> None:
+            loader.profile.statements += 1
+
+        sqlalchemy.event.listen(connection, "before_cursor_execute", count)
 
-            session.add(_bill)
-            session.add(user)
+        try:
+            loader.preload()
+            records = _read_records(path)
+            _load(loader, loader.checkpoint.track(records) if loader.checkpoint is not None else records)
 
-        session.commit()
+            if dry_run:
+                connection.rollback()
 
+            elif loader.checkpoint is not None:
+                loader.checkpoint.clear()
 
-@pydantic.validate_call
-def api(data: pathlib.Path | PostFilledBill) -> bool:
-    if isinstance(data, pathlib.Path):
-        data = PostFilledBill.model_validate_json(data.read_text(encoding="utf8"))
+        finally:
+            sqlalchemy.event.remove(connection, "before_cursor_execute", count)
 
-    with httpx.Client(base_url="http://127.0.0.1:8000") as client:
-        resp = client.post("/api/fill", json=data.model_dump(mode="json"))
+    loader.profile.peak = _peak_memory()
 
-    return resp.is_success
+    return loader
 
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+import concurrent.futures
+import dataclasses
+import functools
+import pathlib
+import time
+import traceback
+import typing
+
+import pydantic
+
+from .. import config
+from ..config import Load
+from ..web.routers.models.post import PostFilledBill
+from .fetch import format_csv
+
+
+@dataclasses.dataclass
+class Result:
+    path: pathlib.Path
+    duration: float = 0.0
+    bill: PostFilledBill | None = None
+    error: str | None = None
+
+
+def _initialize(load: dict[str, typing.Any]) -> None:
+    config.load = Load.model_validate(load)
+
+
+def _convert(parse: typing.Callable[[pathlib.Path], PostFilledBill | None], path: pathlib.Path) -> Result:
+    start = time.perf_counter()
+
+    try:
+        if (bill := parse(path)) is None:
+            return Result(path=path, duration=time.perf_counter() - start)
+
+    except (pydantic.ValidationError, ValueError, OSError) as error:
+        return Result(
+            path=path,
+            duration=time.perf_counter() - start,
+            error="".join(traceback.format_exception_only(error)).strip(),
+        )
+
+    return Result(path=path, duration=time.perf_counter() - start, bill=bill)
+
+
+def convert_directory(
+    directory: pathlib.Path,
+    pattern: str = "*.csv",
+    workers: int | None = None,
+    parse: typing.Callable[[pathlib.Path], PostFilledBill | None] = format_csv,
+) -> list[Result]:
+    """Parse every report matching `pattern` in `directory` with `parse` (a module level function) in a process pool.
+
+    A report that fails to parse (or validate) is returned with its error instead of aborting the others, and one that
+    `parse` skips (returning `None`) without either a bill or an error.
+    """
+    paths = sorted(directory.glob(pattern))
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, initializer=_initialize, initargs=(config.load.model_dump(),)
+    ) as executor:
+        return list(executor.map(functools.partial(_convert, parse), paths))
+
+
+def dump(bills: typing.Iterable[PostFilledBill], stream: typing.TextIO, ndjson: bool = False) -> None:
+    """Write the bills as a JSON array (or one bill per line) that can be loaded with `tmo update bulk`."""
+    if ndjson:
+        stream.writelines(bill.model_dump_json() + "\n" for bill in bills)
+
+        return
+
+    stream.write("[")
+    stream.writelines(("," if index else "") + "\n" + bill.model_dump_json() for index, bill in enumerate(bills))
+
+    stream.write("\n]\n")
@@ -1,14 +1,17 @@
+import asyncio
 import contextlib
 import csv
 import dataclasses
-import decimal
+import datetime
+import importlib.metadata
+import json
 import logging
 import os
 import pathlib
 import random
 import re
 import secrets
-import time
+import tempfile
 import typing
 
 import arrow
@@ -16,8 +19,15 @@ import playwright.async_api as playwright
 import rich.logging
 
 from .. import config
-from ..lib import utilities
+from ..config import Fetch, Timeouts
+from ..lib import cents, timing, utilities
+from ..lib.index import Entry, SubscriberIndex
 from ..web.routers.models.post import FillSubscriber, PostCharge, PostFilledBill
+from .blocking import Blocker
+from .pacing import Pacer
+from .replay import Fixtures
+from .state import StateFile
+from .tracing import Tracer
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -28,120 +38,286 @@ logging.basicConfig(
 )
 
 
-def delayed[**P, T](func: typing.Callable[P, T]) -> typing.Callable[P, T]:
-    def inner(*args: P.args, **kwargs: P.kwargs) -> T:
-        time.sleep(random.randint(1, 30) / 10)
-        return func(*args, **kwargs)
-
-    return inner
-
-
-playwright.Locator.click = delayed(playwright.Locator.click)  # type: ignore[method-assign]
-
-
 @dataclasses.dataclass
 class Fetcher:
     user_agent: typing.Literal["chromium", "firefox", "webkit"] = "chromium"
     headless: bool = False
     login_domain: str = "https://tfb.t-mobile.com"
+    pacer: Pacer = dataclasses.field(default_factory=Pacer)
+    state: StateFile | None = None
+    cache: pathlib.Path | None = None
+    timeouts: Timeouts = dataclasses.field(default_factory=Timeouts)
+    tracer: Tracer = dataclasses.field(default_factory=Tracer)
+    blocker: Blocker | None = None
+    fixtures: Fixtures | None = None
 
-    report_id: str = dataclasses.field(init=False)
     account_number: str = dataclasses.field(init=False)
+    dashboard: str = dataclasses.field(init=False)
+    restored: bool = dataclasses.field(default=False, init=False)
 
     page: playwright.Page = dataclasses.field(init=False)
     context: playwright.BrowserContext = dataclasses.field(init=False)
     browser: playwright.Browser = dataclasses.field(init=False)
 
-    async def _launch(self, runner: playwright.Playwright, headless: bool | None = None) -> playwright.Browser:
-        if headless is None:
-            headless = self.headless
+    @property
+    def downloads(self) -> pathlib.Path:
+        """Where the reports are saved, which the caller of `get_csv` (or `get_csvs`) removes once they are read."""
+        return (self.cache or pathlib.Path(tempfile.gettempdir(), "tmo")).joinpath("downloads")
+
+    @classmethod
+    def from_config(cls, settings: Fetch, fixtures: Fixtures | None = None, **kwargs: typing.Any) -> typing.Self:
+        state = None
 
+        if settings.storage.enabled and fixtures is None:
+            state = StateFile(
+                path=settings.cache.joinpath("state.bin"),
+                secret=settings.password,
+                lifetime=settings.storage.lifetime,
+            )
+
+        # A replay is paced the same way every time, so that its timings can be compared between runs
+        rng = random.Random(0) if fixtures and fixtures.mode == "replay" else random.Random()
+
+        return cls(
+            pacer=Pacer(settings.pacing, rng=rng),
+            state=state,
+            cache=settings.cache,
+            timeouts=settings.timeouts,
+            tracer=Tracer(settings.tracing, settings.tracing.directory or settings.cache.joinpath("traces")),
+            blocker=Blocker(settings.blocking) if settings.blocking.enabled else None,
+            fixtures=fixtures,
+            **kwargs,
+        )
+
+    async def _launch(self, runner: playwright.Playwright) -> playwright.Browser:
         browser: playwright.BrowserType = getattr(runner, self.user_agent)
-        return await browser.launch(headless=headless)
+        return await browser.launch(headless=self.headless)
 
     async def _get_user_agent(self) -> str | None:
         if not self.headless:
             return None
 
-        async with playwright.async_playwright() as runner:
-            browser = await self._launch(runner, True)
-            context = await browser.new_context()
+        key = f"{importlib.metadata.version('playwright')}/{self.user_agent}/{self.browser.version}"
+        path = self.cache.joinpath("user-agents.json") if self.cache else None
+        agents: dict[str, str] = json.loads(path.read_text(encoding="utf8")) if path and path.exists() else {}
+
+        if key in agents:
+            return agents[key]
+
+        logger.debug("Resolving the user agent for %s", key)
+        context = await self.browser.new_context()
+
+        try:
             page = await context.new_page()
+            user_agent: str = (await page.evaluate("navigator.userAgent")).replace("Headless", "")
+
+        finally:
+            await context.close()
+
+        if path:
+            agents[key] = user_agent
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(agents, indent=2), encoding="utf8")
+
+        return user_agent
+
+    async def checkpoint(self, name: str, page: playwright.Page | None = None) -> None:
+        await self.tracer.checkpoint(name)
 
-            user_agent: str = await page.evaluate("navigator.userAgent")
+        if self.fixtures:
+            await self.fixtures.snapshot(page or self.page, name)
 
-            return user_agent.replace("Headless", "")
+    async def click(self, locator: playwright.Locator) -> None:
+        await self.pacer.pause("click")
+        await locator.click()
+
+    async def press(self, locator: playwright.Locator, text: str) -> None:
+        await locator.press_sequentially(text, delay=self.pacer.keystroke(len(text)))
+
+    async def goto(self, url: str, page: playwright.Page | None = None) -> None:
+        await self.pacer.pause("navigation")
+        await (page or self.page).goto(url)
 
     @contextlib.asynccontextmanager
     async def session(self) -> typing.AsyncGenerator[None]:
-        user_agent = await self._get_user_agent()
+        self.pacer.reset()
 
         async with playwright.async_playwright() as runner:
-            self.browser = await self._launch(runner)
-            self.context = await self.browser.new_context(user_agent=user_agent)
-            self.page = await self.context.new_page()
+            storage_state = self.state.load() if self.state else None
+            self.restored = storage_state is not None
+
+            with timing.span("fetch.launch"):
+                self.browser = await self._launch(runner)
+                user_agent = await self._get_user_agent()
+
+                self.context = await self.browser.new_context(
+                    user_agent=user_agent,
+                    storage_state=storage_state,
+                    **(self.fixtures.context_options() if self.fixtures else {}),
+                )
+                self.page = await self.context.new_page()
 
-            await self.context.tracing.start(screenshots=True, snapshots=True, sources=True)
+                if self.fixtures:
+                    await self.fixtures.attach(self.context)
+
+                if self.blocker:
+                    await self.blocker.attach(self.context)
+
+                await self.tracer.start(self.context)
+            failed = True
 
             try:
                 yield
-
-            except BaseException as exc:
-                await self.context.tracing.stop(path=pathlib.Path.cwd().joinpath(f"{secrets.token_hex(8)}.zip"))
-                raise exc
+                failed = False
 
             finally:
+                try:
+                    await self.tracer.stop(failed=failed)
+
+                except (playwright.Error, OSError):
+                    logger.exception("Could not save the trace")
+
                 for page in self.context.pages:
                     await page.close()
 
                 await self.context.close()
+
+                if self.fixtures:
+                    self.fixtures.save()
                 await self.browser.close()
 
-    async def get_csv(self, date: arrow.Arrow) -> str:
+                if self.blocker:
+                    self.blocker.report()
+
+                report = self.pacer.report()
+                logger.info(
+                    "Fetch took %.1fs: %.1fs pacing and %.1fs working", report.elapsed, report.paced, report.working
+                )
+
+    async def _fetch_report(self, date: arrow.Arrow, page: playwright.Page) -> pathlib.Path:
+        report = Report(fetcher=self, page=page, date=date)
+
+        if self.fixtures:
+            report.id = self.fixtures.value("report", date.format("YYYY-MM"), lambda: report.id)
+
+        await report.create()
+        data = await report.download()
+        await report.cleanup()
+
+        return data
+
+    async def get_csv(self, date: arrow.Arrow) -> pathlib.Path:
+        async with self.session():
+            await self.login()
+
+            return await self._fetch_report(date, self.page)
+
+    async def get_csvs(
+        self, dates: typing.Iterable[arrow.Arrow], concurrency: int = 3
+    ) -> dict[arrow.Arrow, pathlib.Path]:
+        """Fetch the reports for several months over a single logged-in session.
+
+        Each month runs in its own tab of the shared browser context, with at most `concurrency` tabs open at once.
+        Months that fail are logged and left out of the result, rather than abandoning the rest of the range.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _fetch(date: arrow.Arrow) -> pathlib.Path:
+            async with semaphore:
+                page = await self.context.new_page()
+
+                try:
+                    await self.goto(self.dashboard, page)
+                    return await self._fetch_report(date, page)
+
+                finally:
+                    await page.close()
+
         async with self.session():
             await self.login()
-            await self.create_report(date)
 
-            report = await self.download_report()
+            dates = list(dates)
+            results = await asyncio.gather(*(_fetch(date) for date in dates), return_exceptions=True)
+
+            reports: dict[arrow.Arrow, pathlib.Path] = {}
+
+            for date, result in zip(dates, results):
+                if isinstance(result, BaseException):
+                    logger.error("Could not fetch the report for %s", date.strftime("%B %Y"), exc_info=result)
+                    self.tracer.failed = True
+                    continue
 
-            await self.cleanup_report()
+                reports[date] = result
 
-        return report
+        return reports
 
+    @timing.timed("fetch.login")
     async def login(self) -> None:
+        await self.checkpoint("login")
         logger.info("Starting login flow at %s", self.login_domain)
 
         logger.debug("Navigating to login page")
-        await self.page.goto(self.login_domain)
+        await self.goto(self.login_domain)
+
+        if self.restored and await self._probe_dashboard():
+            logger.info("Reusing the saved session, skipping the login flow")
+            self.dashboard = self.page.url
+            await self.get_account_number()
+            return
 
         logger.info("Entering user ID in textbox")
         locator = self.page.get_by_role("textbox", name="Email or phone number", exact=True)
-        await locator.press_sequentially(os.environ["TMO_FETCH_username"], delay=random.randint(100, 150))
+        await self.press(locator, os.environ["TMO_FETCH_username"])
 
         logger.debug("Submitting user ID data")
-        await self.page.get_by_role("button", name="Next", exact=True).click()
+        await self.click(self.page.get_by_role("button", name="Next", exact=True))
 
         logger.info("Entering user password in textbox")
         locator = self.page.get_by_role("textbox", name="password")
-        await locator.press_sequentially(os.environ["TMO_FETCH_password"], delay=random.randint(100, 150))
+        await self.press(locator, os.environ["TMO_FETCH_password"])
 
         logger.debug("Submitting user password")
-        await self.page.get_by_role("button", name="Log in", exact=True).click()
+        await self.click(self.page.get_by_role("button", name="Log in", exact=True))
 
         if os.getenv("TMO_FETCH_totp_secret"):
             await self.handle_totp()
 
         await playwright.expect(self.page.get_by_role("button", name="Manage Accounts", exact=True)).to_be_visible(
-            timeout=15e3
+            timeout=self.timeouts.login * 1e3
         )
 
+        self.dashboard = self.page.url
         await self.get_account_number()
 
+        if self.state:
+            logger.debug("Saving the logged-in session for later fetches")
+            self.state.save(await self.context.storage_state())
+
+    @timing.timed("fetch.probe")
+    async def _probe_dashboard(self) -> bool:
+        try:
+            await playwright.expect(self.page.get_by_role("button", name="Manage Accounts", exact=True)).to_be_visible(
+                timeout=self.timeouts.probe * 1e3
+            )
+
+        except AssertionError:
+            logger.info("The saved session is no longer valid; falling back to the full login flow")
+
+            if self.state:
+                self.state.clear()
+
+            await self.goto(self.login_domain)
+            return False
+
+        return True
+
+    @timing.timed("fetch.totp")
     async def handle_totp(self) -> None:
+        await self.checkpoint("totp")
         logger.info("Configuration includes a two-factor authentication method")
         await playwright.expect(
             self.page.get_by_role("heading", name="Let's confirm it's you", exact=True)
-        ).to_be_visible(timeout=15000)
+        ).to_be_visible(timeout=self.timeouts.login * 1e3)
 
         logger.debug("Redirected to the two-factor authentication page")
         box = await self.page.get_by_role("radio", name="Use Google Authenticator", exact=True).bounding_box()
@@ -150,17 +326,22 @@ class Fetcher:
             raise ValueError("Could not complete the TOTP process.")
 
         logger.info("Clicking on the Google Authenticator (TOTP) radio button")
+        await self.pacer.pause("click")
         await self.page.mouse.click(box["x"] + (box["width"] / 2), box["y"] + (box["height"] / 2))
 
         logger.debug("Continuing to TOTP code entry")
-        await self.page.get_by_role("button", name="Continue", exact=True).click()
+        await self.click(self.page.get_by_role("button", name="Continue", exact=True))
 
         code = utilities.generate_totp(os.environ["TMO_FETCH_totp_secret"])
+
+        if self.fixtures:
+            code = self.fixtures.value("totp", "code", lambda: code)
+
         logger.info("Entering TOTP code: %s", code)
-        await self.page.get_by_role("textbox", name="code").press_sequentially(code, delay=random.randint(100, 150))
+        await self.press(self.page.get_by_role("textbox", name="code"), code)
 
         logger.debug("Submitting TOTP code")
-        await self.page.get_by_role("button", name="Continue", exact=True).click()
+        await self.click(self.page.get_by_role("button", name="Continue", exact=True))
 
     async def get_account_number(self) -> None:
         logger.info("Trying to find an account number from the Dashboard page.")
@@ -174,142 +355,228 @@ class Fetcher:
 
         raise ValueError("Could not find the account number from the dashboard page.")
 
-    async def create_report(self, date: arrow.Arrow) -> None:
-        self.report_id = secrets.token_hex(16)
 
-        logger.info("Creating a new report named %s", self.report_id)
+@dataclasses.dataclass
+class Report:
+    fetcher: Fetcher
+    page: playwright.Page
+    date: arrow.Arrow
+
+    id: str = dataclasses.field(default_factory=lambda: secrets.token_hex(16))
+
+    @timing.timed("fetch.create")
+    async def create(self) -> None:
+        await self.fetcher.checkpoint(f"create {self.id}", self.page)
+        logger.info("Creating a new report named %s", self.id)
 
         logger.debug("Opening Reporting page")
-        await self.page.get_by_role("button", name="Reporting", exact=True).click()
+        await self.fetcher.click(self.page.get_by_role("button", name="Reporting", exact=True))
 
         logger.debug("Selecting reports tab")
-        await self.page.get_by_role("tab", name="Reports", exact=True).click()
+        await self.fetcher.click(self.page.get_by_role("tab", name="Reports", exact=True))
 
-        logger.info("Generating report for %s %d", date.strftime("%B"), date.year)
-        await self.page.get_by_role("combobox", name="Select", exact=True).click()
-        await self.page.get_by_role("option", name=date.strftime("%B %Y"), exact=True).click()
+        logger.info("Generating report for %s %d", self.date.strftime("%B"), self.date.year)
+        await self.fetcher.click(self.page.get_by_role("combobox", name="Select", exact=True))
+        await self.fetcher.click(self.page.get_by_role("option", name=self.date.strftime("%B %Y"), exact=True))
 
-        logger.info("Selecting node for account %s", self.account_number)
-        await self.page.get_by_role("textbox", name="Node").click()
-        await self.page.get_by_role("treeitem", name="951667996", exact=True).click()
+        logger.info("Selecting node for account %s", self.fetcher.account_number)
+        await self.fetcher.click(self.page.get_by_role("textbox", name="Node"))
+        await self.fetcher.click(self.page.get_by_role("treeitem", name="951667996", exact=True))
 
         logger.debug("Customizing 'Charges and Usage Summary' report")
         row = self.page.get_by_role("button", name="Charges and Usage Summary Customize", exact=True)
-        await row.get_by_text("Customize", exact=True).click()
+        await self.fetcher.click(row.get_by_text("Customize", exact=True))
 
         logger.debug("Setting report name to unique value")
         locator = self.page.get_by_role("textbox")
 
         logger.debug("Emptying initial report name and assigning random ID")
         await locator.fill("")
-        await locator.press_sequentially(self.report_id, delay=random.randint(100, 150))
+        await self.fetcher.press(locator, self.id)
 
         logger.info("Initializing actual report creation")
-        await self.page.get_by_role("button", name="Create Report", exact=True).click()
+        await self.fetcher.click(self.page.get_by_role("button", name="Create Report", exact=True))
 
         await self.handle_modals()
 
+    @property
+    def row(self) -> playwright.Locator:
+        return self.page.get_by_role("button", name=self.id)
+
+    @timing.timed("fetch.modal")
     async def handle_modals(self) -> None:
-        logger.info("Handling possible modal conflicts.")
-        time.sleep(10)  # NOTE: This probably can be written to use a better expect tag?
+        timeouts = self.fetcher.timeouts
 
+        logger.info("Waiting for the report creation dialog (or the report itself)")
         modal = self.page.get_by_role("dialog")
-        text = await modal.text_content()
+        await playwright.expect(modal.or_(self.row).first).to_be_visible(timeout=timeouts.dialog * 1e3)
 
-        if text is None:
-            raise ValueError("Could not find a modal dialog with text contents")
+        if await modal.is_visible():
+            success = modal.get_by_text("Your request was successfully processed.")
+            progress = modal.get_by_text("Report Creation in Progress")
 
-        if "Your request was successfully processed." in text:
-            logger.debug("The report was successfully processed, per the dialog box")
-            await modal.get_by_role("button", name="Close", exact=True).click()
+            try:
+                await playwright.expect(success.or_(progress)).to_be_visible(timeout=timeouts.dialog * 1e3)
 
-        elif "Report Creation in Progress" in text:
-            logger.debug("The report is still processing, per the dialog box")
-            await modal.get_by_role("button", name="Back", exact=True).click()
+            except AssertionError as exc:
+                raise ValueError("Unknown modal type was found...") from exc
 
-        else:
-            raise Exception("Unknown modal type was found...")
+            if await success.is_visible():
+                logger.debug("The report was successfully processed, per the dialog box")
+                await self.fetcher.click(modal.get_by_role("button", name="Close", exact=True))
+
+            else:
+                logger.debug("The report is still processing, per the dialog box")
+                await self.fetcher.click(modal.get_by_role("button", name="Back", exact=True))
+
+        await self.wait_until_ready()
+
+    @timing.timed("fetch.ready")
+    async def wait_until_ready(self) -> None:
+        """Poll the "My Reports" list, with exponential backoff, until the report row can be opened.
+
+        Each poll waits on the row itself, so it returns as soon as the list renders the report rather than after
+        the full backoff interval.
+        """
+        await self.fetcher.checkpoint(f"wait {self.id}", self.page)
+
+        timeouts = self.fetcher.timeouts
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeouts.report
+        interval = timeouts.poll
 
-        logger.debug("Returning to reports page")
         region = self.page.get_by_role("region", name="Reporting", exact=True)
-        await region.get_by_text("My Reports", exact=True).click()
 
-    async def _open_report_menu(self) -> None:
-        logger.info("Opening the generated report %s", self.report_id)
-        row = self.page.get_by_role("button", name=self.report_id)
+        while True:
+            logger.debug("Refreshing the reports list")
+            await self.fetcher.click(region.get_by_text("My Reports", exact=True))
+
+            try:
+                await self.row.wait_for(state="visible", timeout=interval * 1e3)
+
+                if await self.row.get_by_role("button").is_enabled():
+                    logger.info("Report %s is ready", self.id)
+                    return
+
+            except playwright.TimeoutError:
+                pass
 
+            if loop.time() + interval > deadline:
+                raise TimeoutError(f"Report {self.id} was not ready after {timeouts.report:.0f} seconds")
+
+            logger.debug("Report %s is not ready yet; checking again in %.1fs", self.id, interval)
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, timeouts.poll_max)
+
+    async def _open_menu(self) -> None:
+        logger.info("Opening the generated report %s", self.id)
         logger.debug("Opening the hamburger/elipsis icon for the report")
-        await row.get_by_role("button").click()
+        await self.fetcher.click(self.row.get_by_role("button"))
 
-    async def download_report(self) -> str:
-        await self._open_report_menu()
+    @timing.timed("fetch.download")
+    async def download(self) -> pathlib.Path:
+        await self.fetcher.checkpoint(f"download {self.id}", self.page)
+        await self._open_menu()
 
         logger.debug("Opening download modal")
-        await self.page.get_by_role("menuitem", name="Download", exact=True).click()
+        await self.fetcher.click(self.page.get_by_role("menuitem", name="Download", exact=True))
 
-        async with self.page.expect_download() as event:
+        async with self.page.expect_download(timeout=self.fetcher.timeouts.download * 1e3) as event:
             logger.info("Finally getting the CSV file")
-            await self.page.get_by_role("button", name="Download", exact=True).click()
+            await self.fetcher.click(self.page.get_by_role("button", name="Download", exact=True))
 
         download = await event.value
 
-        return (await download.path()).read_text(encoding="utf8")
+        path = self.fetcher.downloads.joinpath(f"{self.date.format('YYYY-MM')}-{self.id}.csv")
+        await download.save_as(path)
+
+        return path
 
-    async def cleanup_report(self) -> None:
-        await self._open_report_menu()
+    @timing.timed("fetch.cleanup")
+    async def cleanup(self) -> None:
+        await self.fetcher.checkpoint(f"cleanup {self.id}", self.page)
+        await self._open_menu()
 
         logger.info("Deleting report from account")
-        await self.page.get_by_role("menuitem", name="Delete", exact=True).click()
+        await self.fetcher.click(self.page.get_by_role("menuitem", name="Delete", exact=True))
 
 
-def _find_number(raw: str) -> tuple[str, str]:
-    for number, name in config.load.numbers.items():
-        if raw == number.replace("-", ""):
-            return number, name
+def _find_number(raw: str, numbers: SubscriberIndex[Entry]) -> tuple[str, str]:
+    if entry := numbers.get(raw):
+        return entry.number, entry.name
 
     return raw, "N/A"
 
 
-def _ensure_zero(value: str) -> decimal.Decimal:
-    amount = decimal.Decimal(value)
+def _ensure_zero(value: str) -> int:
+    amount = cents.parse(value)
 
-    if amount != decimal.Decimal("0"):
+    if amount != 0:
         raise ValueError("Need some more details for usage")
 
     return amount
 
 
-def format_csv(data: str) -> PostFilledBill:
-    # Removing special characters
-    data = data.replace("$", "")
+def read_report(lines: typing.Iterable[str]) -> tuple[datetime.date, typing.Iterator[dict[str, str]]]:
+    """Incrementally read a "Charges and Usage Summary" report.
 
-    header = ""
+    The preamble is consumed up to (and including) the subscriber table header, which is only parsed once. The
+    returned iterator then parses the remaining rows on demand, with the currency symbols stripped from each field.
+    """
+    lines = iter(lines)
+    period: datetime.date | None = None
 
-    taxes = decimal.Decimal("0")
-    service = decimal.Decimal("0")
-
-    for text in data.splitlines():
+    for text in lines:
         if text.startswith("Billing Period Ending"):
+            period = arrow.get(text, "MMMM YYYY").replace(day=1).shift(months=+1).date()
+
+        elif text.startswith("Subscriber"):
+            [header] = csv.reader([text])
             break
 
-    bill = PostFilledBill(date=arrow.get(text, "MMMM YYYY").replace(day=1).shift(months=+1).date())
+    else:
+        raise ValueError("Could not find the subscriber table in the report")
 
-    for text in data.splitlines():
-        if text.startswith("Subscriber"):
-            header = text
-            continue
+    if period is None:
+        raise ValueError("Could not find the billing period in the report")
 
-        if header:
-            [reader] = csv.DictReader([text], header.split(","))
+    def rows() -> typing.Iterator[dict[str, str]]:
+        for row in csv.reader(lines):
+            if row:
+                yield {key: value.replace("$", "") for key, value in zip(header, row)}
 
-            service += decimal.Decimal(reader["Plans"])
-            taxes += decimal.Decimal(reader["Taxes and Fees"])
+    return period, rows()
 
-            number, name = _find_number(reader["Subscriber Number"])
+
+@timing.timed("format_csv")
+def format_csv(data: str | pathlib.Path) -> PostFilledBill:
+    with contextlib.ExitStack() as stack:
+        if isinstance(data, pathlib.Path):
+            lines: typing.Iterable[str] = stack.enter_context(data.open(encoding="utf8", newline=""))
+
+        else:
+            lines = data.splitlines(keepends=True)
+
+        date, rows = read_report(lines)
+        bill = PostFilledBill(date=date)
+        index = SubscriberIndex.from_numbers(config.load.numbers)
+
+        taxes = 0
+        service = 0
+        phones = 0
+
+        for reader in rows:
+            service += cents.parse(reader["Plans"])
+            taxes += cents.parse(reader["Taxes and Fees"])
+
+            number, name = _find_number(reader["Subscriber Number"], index)
 
             if name == "N/A":
                 continue
 
+            phone = cents.parse(reader["Equipment"])
+            phones += phone
+
             bill.subscribers.append(
                 FillSubscriber.model_validate(
                     {
@@ -318,7 +585,7 @@ def format_csv(data: str) -> PostFilledBill:
                         "minutes": reader["Talk Minutes"],
                         "messages": reader["Text Messages"],
                         "data": reader["Data "],
-                        "phone": reader["Equipment"],
+                        "phone": cents.to_decimal(phone),
                         "line": 0,
                         "insurance": 0,
                         "usage": 0,
@@ -335,33 +602,13 @@ def format_csv(data: str) -> PostFilledBill:
             ):
                 _ensure_zero(reader[key])
 
-    bill.charges.append(PostCharge(name="taxes", split=True, total=taxes))
-
-    for subscriber in bill.subscribers:
-        subscriber.line = service / len(bill.subscribers)
-
-    bill.total = sum(
-        (
-            *(charge.total for charge in bill.charges),
-            *(sub.phone + sub.line + sub.insurance + sub.usage for sub in bill.subscribers),
-        ),
-        start=decimal.Decimal(),
-    )
-
-    # TODO: Replace this (and other little hacky fixes) with a plugin system
-    for key, numbers in config.load.swap.items():
-        storage = {}
+    bill.charges.append(PostCharge(name="taxes", split=True, total=cents.to_decimal(taxes)))
 
-        for old, new in numbers.items():
-            for subscriber in bill.subscribers:
-                if subscriber.number == old:
-                    storage[new] = getattr(subscriber, key)
+    shares = cents.split(service, len(bill.subscribers))
 
-                if subscriber.number == new:
-                    storage[old] = getattr(subscriber, key)
+    for subscriber, share in zip(bill.subscribers, shares):
+        subscriber.line = cents.to_decimal(share)
 
-        for subscriber in bill.subscribers:
-            if subscriber.number in storage:
-                setattr(subscriber, key, storage[subscriber.number])
+    bill.total = cents.to_decimal(taxes + sum(shares) + phones)
 
     return bill
@@ -0,0 +1,72 @@
+import asyncio
+import dataclasses
+import random
+import time
+import typing
+
+from ..config import Delay, Pacing
+
+Action = typing.Literal["click", "keystroke", "navigation"]
+
+
+@dataclasses.dataclass(frozen=True)
+class PacingReport:
+    paced: float
+    elapsed: float
+
+    @property
+    def working(self) -> float:
+        return max(self.elapsed - self.paced, 0.0)
+
+
+@dataclasses.dataclass
+class Pacer:
+    """Humanized, non-blocking delays for scripted browser actions.
+
+    A single pacer can be shared by several fetches running on the same event loop; every delay is awaited with
+    `asyncio.sleep` and accumulated so the time spent pacing can be separated from the time spent working.
+    """
+
+    settings: Pacing = dataclasses.field(default_factory=Pacing)
+    rng: random.Random = dataclasses.field(default_factory=random.Random, repr=False)
+
+    paced: float = dataclasses.field(default=0.0, init=False)
+    started: float = dataclasses.field(default_factory=time.monotonic, init=False)
+
+    def sample(self, action: Action) -> float:
+        delay: Delay = getattr(self.settings, action)
+
+        match delay.distribution:
+            case "fixed":
+                return delay.low
+
+            case "uniform":
+                return self.rng.uniform(delay.low, delay.high)
+
+            case "normal":
+                mean = (delay.low + delay.high) / 2
+                return min(max(self.rng.gauss(mean, (delay.high - delay.low) / 4), delay.low), delay.high)
+
+    async def wait(self, seconds: float) -> None:
+        self.paced += seconds
+        await asyncio.sleep(seconds)
+
+    async def pause(self, action: Action) -> None:
+        await self.wait(self.sample(action))
+
+    def keystroke(self, count: int) -> float:
+        """Sample a per-key delay (in milliseconds, as Playwright expects) for typing `count` characters.
+
+        Playwright performs the waiting itself, so the total is only recorded here.
+        """
+        delay = self.sample("keystroke")
+        self.paced += delay * count
+
+        return delay * 1e3
+
+    def reset(self) -> None:
+        self.paced = 0.0
+        self.started = time.monotonic()
+
+    def report(self) -> PacingReport:
+        return PacingReport(paced=self.paced, elapsed=time.monotonic() - self.started)
@@ -0,0 +1,152 @@
+import collections
+import dataclasses
+import decimal
+import typing
+
+import psycopg
+
+from ..web.routers.models.post import PostFilledBill
+from .bulk import BulkLoader
+
+_STAGING = {
+    "tmo_stage_bill": "date date NOT NULL, total numeric NOT NULL",
+    "tmo_stage_subscriber": "number varchar NOT NULL, name varchar NOT NULL, format varchar NOT NULL",
+    "tmo_stage_detail": (
+        "date date NOT NULL, number varchar NOT NULL, phone numeric NOT NULL, line numeric NOT NULL,"
+        " insurance numeric NOT NULL, usage numeric NOT NULL, minutes integer NOT NULL, messages integer NOT NULL,"
+        " data numeric NOT NULL, total numeric NOT NULL"
+    ),
+    "tmo_stage_charge": "date date NOT NULL, name varchar NOT NULL, split boolean NOT NULL, total numeric NOT NULL",
+}
+
+_COLUMNS = {table: tuple(column.split()[0] for column in columns.split(",")) for table, columns in _STAGING.items()}
+
+_MERGE = (
+    """
+    INSERT INTO subscriber (number, name, format)
+    SELECT DISTINCT ON (staged.number) staged.number, staged.name, staged.format
+    FROM tmo_stage_subscriber AS staged
+    ORDER BY staged.number
+    ON CONFLICT (number) DO NOTHING
+    """,
+    """
+    INSERT INTO bill (date, total)
+    SELECT staged.date, sum(staged.total)
+    FROM tmo_stage_bill AS staged
+    GROUP BY staged.date
+    ON CONFLICT (date) DO UPDATE SET total = bill.total + excluded.total
+    """,
+    """
+    INSERT INTO detail (phone, line, insurance, usage, minutes, messages, data, total, bill_id, subscriber_id)
+    SELECT staged.phone, staged.line, staged.insurance, staged.usage, staged.minutes, staged.messages, staged.data,
+           staged.total, bill.id, subscriber.id
+    FROM tmo_stage_detail AS staged
+    JOIN bill ON bill.date = staged.date
+    JOIN subscriber ON subscriber.number = staged.number
+    """,
+    """
+    INSERT INTO charge (name, split, total, bill_id)
+    SELECT staged.name, staged.split, staged.total, bill.id
+    FROM tmo_stage_charge AS staged
+    JOIN bill ON bill.date = staged.date
+    """,
+    """
+    INSERT INTO billsubscriberlink (bill_id, subscriber_id)
+    SELECT DISTINCT bill.id, subscriber.id
+    FROM tmo_stage_detail AS staged
+    JOIN bill ON bill.date = staged.date
+    JOIN subscriber ON subscriber.number = staged.number
+    ON CONFLICT DO NOTHING
+    """,
+)
+
+
+@dataclasses.dataclass
+class CopyLoader(BulkLoader):
+    """A `BulkLoader` for PostgreSQL that streams each batch into temporary staging tables with `COPY ... FROM STDIN`.
+
+    The staged rows are then merged into the real tables with a handful of set-based statements (joining on the bill
+    date and subscriber number), so no ids are needed on the Python side at all.
+    """
+
+    _staging: bool = dataclasses.field(default=False, init=False, repr=False)
+
+    def _cursor(self) -> psycopg.Cursor[typing.Any]:
+        driver = self.connection.connection.driver_connection
+        assert isinstance(driver, psycopg.Connection)
+
+        return driver.cursor()
+
+    def stage(self, bills: list[PostFilledBill]) -> dict[str, list[tuple[typing.Any, ...]]]:
+        rows: dict[str, list[tuple[typing.Any, ...]]] = collections.defaultdict(list)
+        subscribers: dict[str, tuple[typing.Any, ...]] = {}
+
+        for bill in bills:
+            total = sum((charge.total for charge in bill.charges), start=decimal.Decimal())
+
+            for charge in bill.charges:
+                rows["tmo_stage_charge"].append((bill.date, charge.name, charge.split, charge.total))
+
+            for data in bill.subscribers:
+                detail = data.phone + data.line + data.insurance + data.usage
+                total += detail
+
+                rows["tmo_stage_detail"].append(
+                    (
+                        bill.date,
+                        data.number,
+                        data.phone,
+                        data.line,
+                        data.insurance,
+                        data.usage,
+                        data.minutes,
+                        data.messages,
+                        data.data,
+                        detail,
+                    )
+                )
+
+                if data.number not in self.subscribers:
+                    subscribers.setdefault(
+                        data.number, (data.number, f"{data.name} {self.names[data.name]}", data.format)
+                    )
+
+            rows["tmo_stage_bill"].append((bill.date, total))
+
+        rows["tmo_stage_subscriber"] = list(subscribers.values())
+
+        return rows
+
+    def flush(self) -> None:
+        if not self._pending or self.upsert:
+            return super().flush()
+
+        pending, self._pending = self._pending, []
+
+        # The raw cursor bypasses SQLAlchemy, which would otherwise not know there is a transaction to commit
+        if not self.connection.in_transaction():
+            self.connection.begin()
+
+        with self._cursor() as cursor:
+            if not self._staging:
+                for table, columns in _STAGING.items():
+                    cursor.execute(f"CREATE TEMPORARY TABLE IF NOT EXISTS {table} ({columns})")
+
+                self._staging = True
+                self.profile.statements += len(_STAGING)
+
+            for table, rows in self.stage(pending).items():
+                with cursor.copy(f"COPY {table} ({', '.join(_COLUMNS[table])}) FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+
+            for statement in _MERGE:
+                cursor.execute(statement)
+
+            cursor.execute(f"TRUNCATE {', '.join(_STAGING)}")
+
+        # The raw cursor isn't seen by the statement counter: a COPY per staging table, the merges and the TRUNCATE
+        self.profile.statements += len(_STAGING) + len(_MERGE) + 1
+
+        # Only the numbers are needed to skip staging known subscribers again; the ids stay in the database
+        self.subscribers.update({data.number: 0 for bill in pending for data in bill.subscribers})
@@ -0,0 +1,95 @@
+import collections
+import dataclasses
+import json
+import logging
+import pathlib
+import re
+import statistics
+import typing
+
+import playwright.async_api as playwright
+
+from ..lib import timing
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class Fixtures:
+    """Recorded portal traffic used to run the Fetcher offline.
+
+    In `record` mode the whole session is captured to a HAR archive (with embedded content), the DOM is saved at
+    every step, and the non-deterministic values typed into the portal (report names and TOTP codes) are written
+    to a manifest. In `replay` mode the browser context is served entirely from that HAR archive, with unknown
+    requests aborted, and the manifest values are typed again so that every request matches its recording.
+
+    The recording contains the login requests (and therefore the credentials); keep the directory private.
+    """
+
+    directory: pathlib.Path
+    mode: typing.Literal["record", "replay"] = "replay"
+
+    manifest: dict[str, dict[str, str]] = dataclasses.field(default_factory=lambda: collections.defaultdict(dict))
+    _snapshots: int = dataclasses.field(default=0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.mode == "replay":
+            if not self.har.exists():
+                raise FileNotFoundError(f"Could not find a recorded session at {self.har}")
+
+            self.manifest.update(json.loads(self.directory.joinpath("manifest.json").read_text(encoding="utf8")))
+
+    @property
+    def har(self) -> pathlib.Path:
+        return self.directory.joinpath("session.har")
+
+    @property
+    def months(self) -> list[str]:
+        return sorted(self.manifest.get("report", {}))
+
+    def context_options(self) -> dict[str, typing.Any]:
+        if self.mode == "record":
+            self.directory.mkdir(parents=True, exist_ok=True)
+            return {"record_har_path": self.har, "record_har_content": "embed"}
+
+        return {}
+
+    async def attach(self, context: playwright.BrowserContext) -> None:
+        if self.mode == "replay":
+            await context.route_from_har(self.har, not_found="abort")
+
+    def value(self, kind: str, key: str, generate: typing.Callable[[], str]) -> str:
+        if self.mode == "replay":
+            return self.manifest[kind][key]
+
+        value = self.manifest[kind][key] = generate()
+        return value
+
+    async def snapshot(self, page: playwright.Page, name: str) -> None:
+        if self.mode != "record":
+            return
+
+        directory = self.directory.joinpath("dom")
+        directory.mkdir(parents=True, exist_ok=True)
+
+        self._snapshots += 1
+        slug = re.sub(r"[^\w.-]+", "-", name)
+        directory.joinpath(f"{self._snapshots:03d}-{slug}.html").write_text(await page.content(), encoding="utf8")
+
+    def save(self) -> None:
+        if self.mode == "record":
+            path = self.directory.joinpath("manifest.json")
+            path.write_text(json.dumps(self.manifest, indent=2, sort_keys=True), encoding="utf8")
+
+
+def summarize(runs: typing.Sequence[timing.Run]) -> list[tuple[str, float, float, float]]:
+    """Collapse the spans of several benchmark runs into (step, mean, min, max) wall times, in order of first use."""
+    steps: dict[str, list[float]] = {}
+
+    for run in runs:
+        for name, total in run.totals().items():
+            steps.setdefault(name, []).append(total)
+
+    steps["total"] = [run.duration for run in runs]
+
+    return [(name, statistics.fmean(values), min(values), max(values)) for name, values in steps.items()]
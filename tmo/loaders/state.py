@@ -0,0 +1,77 @@
+import base64
+import dataclasses
+import datetime
+import hashlib
+import json
+import logging
+import pathlib
+import secrets
+import typing
+
+import playwright.async_api as playwright
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+
+except ImportError:
+    Fernet = None  # type: ignore[assignment,misc]
+
+logger = logging.getLogger(__name__)
+
+_SALT_SIZE = 16
+
+
+def _derive_key(secret: str, salt: bytes) -> bytes:
+    return base64.urlsafe_b64encode(hashlib.scrypt(secret.encode("utf8"), salt=salt, n=2**14, r=8, p=1, dklen=32))
+
+
+@dataclasses.dataclass
+class StateFile:
+    """Encrypted Playwright storage state (cookies and local storage) kept between fetches.
+
+    The key is derived from `secret` with a per-file salt, and the Fernet token timestamp is used to expire the
+    state after `lifetime`.
+    """
+
+    path: pathlib.Path
+    secret: str
+    lifetime: datetime.timedelta = datetime.timedelta(hours=12)
+
+    @property
+    def available(self) -> bool:
+        if Fernet is None:
+            logger.warning("Install the `cryptography` package to remember logged-in sessions between fetches.")
+            return False
+
+        return True
+
+    def load(self) -> playwright.StorageState | None:
+        if not self.available or not self.path.exists():
+            return None
+
+        raw = self.path.read_bytes()
+        salt, token = raw[:_SALT_SIZE], raw[_SALT_SIZE:]
+
+        try:
+            data = Fernet(_derive_key(self.secret, salt)).decrypt(token, ttl=int(self.lifetime.total_seconds()))
+
+        except InvalidToken:
+            logger.info("The saved session has expired or cannot be decrypted; discarding it")
+            self.clear()
+            return None
+
+        return typing.cast(playwright.StorageState, json.loads(data))
+
+    def save(self, state: playwright.StorageState) -> None:
+        if not self.available:
+            return
+
+        salt = secrets.token_bytes(_SALT_SIZE)
+        token = Fernet(_derive_key(self.secret, salt)).encrypt(json.dumps(state).encode("utf8"))
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(mode=0o600, exist_ok=True)
+        self.path.write_bytes(salt + token)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,129 @@
+import asyncio
+import dataclasses
+import datetime
+import logging
+import pathlib
+import shutil
+import tempfile
+import typing
+
+import playwright.async_api as playwright
+
+from ..config import Tracing
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class Tracer:
+    """Playwright tracing for a fetch session, following the configured `fetch.tracing.mode`.
+
+    - `off`: no tracing at all
+    - `on-failure`: lightweight tracing (no screenshots or sources) recorded in chunks, one per step. Only the last
+      `buffer` chunks are kept and they are only saved when the session fails.
+    - `sampled`: full tracing for every `rate`-th session, saved regardless of the outcome
+    - `full`: full tracing for every session, saved regardless of the outcome
+
+    Saved traces are written to `directory`, which only keeps the newest `keep` archives.
+    """
+
+    settings: Tracing = dataclasses.field(default_factory=Tracing)
+    directory: pathlib.Path = pathlib.Path(".tmo/traces")
+
+    mode: typing.Literal["off", "ring", "full"] = dataclasses.field(default="off", init=False)
+    failed: bool = dataclasses.field(default=False, init=False)
+
+    _context: playwright.BrowserContext = dataclasses.field(init=False, repr=False)
+    _ring: list[pathlib.Path] = dataclasses.field(default_factory=list, init=False, repr=False)
+    _chunks: int = dataclasses.field(default=0, init=False, repr=False)
+    _buffer: pathlib.Path = dataclasses.field(init=False, repr=False)
+    _lock: asyncio.Lock = dataclasses.field(init=False, repr=False)
+
+    def _sample(self) -> bool:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        counter = self.directory.joinpath(".counter")
+
+        count = int(counter.read_text(encoding="utf8") or 0) + 1 if counter.exists() else 1
+        counter.write_text(str(count), encoding="utf8")
+
+        return count % self.settings.rate == 0
+
+    async def start(self, context: playwright.BrowserContext) -> None:
+        self._context = context
+        self._lock = asyncio.Lock()
+        self.failed = False
+
+        match self.settings.mode:
+            case "full":
+                self.mode = "full"
+
+            case "sampled":
+                self.mode = "full" if self._sample() else "off"
+
+            case "on-failure":
+                self.mode = "ring"
+
+            case _:
+                self.mode = "off"
+
+        if self.mode == "full":
+            await context.tracing.start(screenshots=True, snapshots=True, sources=True)
+
+        elif self.mode == "ring":
+            self._ring.clear()
+            self._chunks = 0
+            self._buffer = pathlib.Path(tempfile.mkdtemp(prefix="tmo-trace-"))
+
+            await context.tracing.start(snapshots=True)
+            await context.tracing.start_chunk(title="start")
+
+    async def checkpoint(self, title: str) -> None:
+        """Close the current chunk of the ring buffer and start a new one named `title`.
+
+        The pages of a range fetch share the context (and its tracing), so their checkpoints are taken one at a time:
+        Playwright rejects stopping a chunk while another one is being stopped.
+        """
+        if self.mode != "ring":
+            return
+
+        async with self._lock:
+            path = self._buffer.joinpath(f"{self._chunks:04d}.zip")
+            self._chunks += 1
+            await self._context.tracing.stop_chunk(path=path)
+
+            self._ring.append(path)
+
+            while len(self._ring) > self.settings.buffer:
+                self._ring.pop(0).unlink(missing_ok=True)
+
+            await self._context.tracing.start_chunk(title=title)
+
+    async def stop(self, failed: bool) -> None:
+        if self.mode == "off":
+            return
+
+        stamp = datetime.datetime.now().strftime("%Y%m%dT%H%M%S.%f")
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        match self.mode:
+            case "full":
+                await self._context.tracing.stop(path=self.directory.joinpath(f"{stamp}.zip"))
+
+            case "ring":
+                await self.checkpoint("stop")
+                await self._context.tracing.stop()
+
+                if failed or self.failed:
+                    for index, chunk in enumerate(self._ring):
+                        shutil.move(chunk, self.directory.joinpath(f"{stamp}-{index}.zip"))
+
+                shutil.rmtree(self._buffer, ignore_errors=True)
+
+        self._rotate()
+
+    def _rotate(self) -> None:
+        traces = sorted(self.directory.glob("*.zip"), key=lambda path: path.stat().st_mtime, reverse=True)
+
+        for trace in traces[self.settings.keep :]:
+            logger.debug("Removing old trace %s", trace)
+            trace.unlink(missing_ok=True)
@@ -0,0 +1,121 @@
+import collections.abc
+import dataclasses
+import functools
+import importlib.metadata
+import json
+import logging
+import typing
+
+from .. import config
+from ..config import Load
+from ..lib.index import normalize_number
+from ..web.routers.models.post import PostFilledBill
+
+logger = logging.getLogger(__name__)
+
+Transform = typing.Callable[[list[PostFilledBill]], list[PostFilledBill]]
+
+ENTRY_POINTS = "tmo.transforms"
+
+_registry: dict[str, Transform] = {}
+
+
+def register[F: Transform](name: str) -> typing.Callable[[F], F]:
+    """Register a transform under `name`, so that it can be enabled with `load.transforms` in the config.
+
+    Transforms can also be provided by other packages through the `tmo.transforms` entry point group.
+    """
+
+    def decorator(func: F) -> F:
+        _registry[name] = func
+        _compile.cache_clear()
+
+        return func
+
+    return decorator
+
+
+def _lookup(name: str) -> Transform:
+    if name not in _registry:
+        for entry_point in importlib.metadata.entry_points(group=ENTRY_POINTS, name=name):
+            _registry[name] = entry_point.load()
+            break
+
+        else:
+            raise KeyError(f"Could not find a transform named {name!r}")
+
+    return _registry[name]
+
+
+@dataclasses.dataclass(frozen=True)
+class Swap:
+    """The `load.swap` rules, compiled to a target -> source number permutation for each field.
+
+    Each rule `{old: new}` swaps the values of the field between the two subscribers. All of the rules for a field are
+    applied at once, so a bill is updated in a single pass, reading only the values it had before the swap.
+    """
+
+    permutations: dict[str, dict[str, str]]
+
+    @classmethod
+    def compile(cls, rules: collections.abc.Mapping[str, collections.abc.Mapping[str, str]]) -> typing.Self:
+        permutations: dict[str, dict[str, str]] = {}
+
+        for field, numbers in rules.items():
+            permutation = permutations[field] = {}
+
+            for old, new in numbers.items():
+                permutation[normalize_number(new)] = normalize_number(old)
+                permutation[normalize_number(old)] = normalize_number(new)
+
+        return cls(permutations={field: permutation for field, permutation in permutations.items() if permutation})
+
+    def __call__(self, bills: list[PostFilledBill]) -> list[PostFilledBill]:
+        for bill in bills:
+            subscribers = {normalize_number(subscriber.number): subscriber for subscriber in bill.subscribers}
+
+            for field, permutation in self.permutations.items():
+                values = {
+                    target: getattr(subscribers[source], field)
+                    for target, source in permutation.items()
+                    if target in subscribers and source in subscribers
+                }
+
+                for target, value in values.items():
+                    setattr(subscribers[target], field, value)
+
+        return bills
+
+
+@dataclasses.dataclass(frozen=True)
+class Pipeline:
+    transforms: tuple[Transform, ...] = ()
+
+    def __call__(self, bills: collections.abc.Iterable[PostFilledBill]) -> list[PostFilledBill]:
+        batch = list(bills)
+
+        for transform in self.transforms:
+            batch = transform(batch)
+
+        return batch
+
+
+@functools.cache
+def _compile(swap: str, names: tuple[str, ...]) -> Pipeline:
+    transforms: list[Transform] = []
+
+    if rules := Swap.compile(json.loads(swap)).permutations:
+        transforms.append(Swap(rules))
+
+    transforms.extend(_lookup(name) for name in names)
+
+    logger.debug("Compiled a pipeline of %d transforms", len(transforms))
+
+    return Pipeline(tuple(transforms))
+
+
+def pipeline(settings: Load | None = None) -> Pipeline:
+    """The transform pipeline for `settings` (defaulting to the loaded config), compiled once per configuration."""
+    settings = settings or config.load
+
+    return _compile(json.dumps(settings.swap, sort_keys=True), tuple(settings.transforms))
@@ -0,0 +1,132 @@
+import asyncio
+import dataclasses
+import datetime
+import logging
+import time
+import types
+import typing
+
+import httpx
+
+from .. import config
+from ..lib import timing
+from ..web.routers.models.post import PostFilledBill
+
+logger = logging.getLogger(__name__)
+
+_TRANSIENT = {408, 429, 500, 502, 503, 504}
+
+
+@dataclasses.dataclass
+class Throughput:
+    sent: int = 0
+    retried: int = 0
+    failed: list[datetime.date] = dataclasses.field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.sent / self.duration if self.duration else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Sent {self.sent} bills in {self.duration:.2f}s ({self.rate:.1f}/s), "
+            f"{self.retried} retries, {len(self.failed)} failed"
+        )
+
+
+@dataclasses.dataclass
+class Uploader:
+    """Post bills to `/api/fill` over a single pooled (keep-alive) client, at most `concurrency` at a time.
+
+    Connection errors and transient statuses are retried up to `retries` times, waiting `backoff` seconds before the
+    first retry and doubling after each one. Anything else (e.g. a bill that already exists) fails straight away.
+    """
+
+    base_url: str = dataclasses.field(default_factory=lambda: config.api.base_url)
+    concurrency: int = 8
+    retries: int = 3
+    backoff: float = 0.5
+    timeout: float = 30.0
+    transport: httpx.AsyncBaseTransport | None = dataclasses.field(default=None, repr=False)
+
+    _client: httpx.AsyncClient | None = dataclasses.field(default=None, init=False, repr=False)
+
+    async def __aenter__(self) -> typing.Self:
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+            transport=self.transport,
+        )
+
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: types.TracebackType | None,
+    ) -> None:
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    @timing.timed("api.fill")
+    async def post(self, bill: PostFilledBill, upsert: bool = False, report: Throughput | None = None) -> bool:
+        assert self._client, "The uploader must be entered (`async with`) before posting"
+
+        body = bill.model_dump(mode="json")
+        delay = self.backoff
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                logger.debug("Retrying the bill for %s in %.1fs", bill.date, delay)
+                await asyncio.sleep(delay)
+                delay *= 2
+
+                if report:
+                    report.retried += 1
+
+            try:
+                response = await self._client.post("/api/fill", json=body, params={"upsert": upsert})
+
+            except httpx.TransportError as error:
+                logger.warning("Could not send the bill for %s: %r", bill.date, error)
+                continue
+
+            if response.is_success:
+                return True
+
+            logger.warning("The bill for %s was rejected with %d: %s", bill.date, response.status_code, response.text)
+
+            if response.status_code not in _TRANSIENT:
+                break
+
+        return False
+
+    async def upload(self, bills: typing.Iterable[PostFilledBill], upsert: bool = False) -> Throughput:
+        """Post every bill, pulling them from `bills` only as fast as they are sent."""
+        report = Throughput()
+        iterator = iter(bills)
+        start = time.perf_counter()
+
+        async def worker() -> None:
+            for bill in iterator:
+                if await self.post(bill, upsert=upsert, report=report):
+                    report.sent += 1
+
+                else:
+                    report.failed.append(bill.date)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        report.duration = time.perf_counter() - start
+
+        logger.info("%s", report)
+
+        return report
+
+
+async def upload(bills: typing.Iterable[PostFilledBill], upsert: bool = False, **options: typing.Any) -> Throughput:
+    async with Uploader(**options) as uploader:
+        return await uploader.upload(bills, upsert=upsert)
@@ -0,0 +1,152 @@
+import datetime
+import decimal
+import itertools
+import pathlib
+import typing
+
+import openpyxl  # type: ignore[import-untyped]
+from openpyxl.workbook.workbook import Workbook  # type: ignore[import-untyped]
+
+from ..lib import cents
+from ..lib.index import normalize_number
+from ..web.routers.models.post import FillSubscriber, PostFilledBill
+
+# These two workbooks seem to be strange (and one of them isn't even a real date)
+_SKIP = {"2019.06.27", "2019.06.31"}
+
+_DATA = decimal.Decimal("0.0001")
+
+_Usage = dict[str, tuple[typing.Any, typing.Any, typing.Any]]
+
+
+def _columns(
+    sheet: typing.Any, min_row: int, max_row: int, min_col: int, max_col: int
+) -> typing.Iterator[tuple[typing.Any, ...]]:
+    """The sheet's columns, transposed from its rows as read-only worksheets can only be read row by row."""
+    return zip(*sheet.iter_rows(min_row, max_row, min_col, max_col, values_only=True))
+
+
+def _rows(sheet: typing.Any, min_row: int, max_row: int, min_col: int, max_col: int) -> _Usage:
+    """The minutes, messages and data by number in a table of usage rows, which ends at the first without messages."""
+    usage: _Usage = {}
+
+    for number, minutes, messages, gigs in sheet.iter_rows(min_row, max_row, min_col, max_col, values_only=True):
+        if messages is None:
+            break
+
+        if number is not None:
+            usage[normalize_number(str(number))] = (minutes, messages, gigs)
+
+    return usage
+
+
+def _money(value: typing.Any) -> decimal.Decimal:
+    return cents.to_decimal(cents.from_decimal(decimal.Decimal(str(value or 0))))
+
+
+def _subscriber(
+    number: typing.Any,
+    name: typing.Any,
+    _: typing.Any,
+    phone: typing.Any,
+    line: typing.Any,
+    ins: typing.Any,
+    usage: typing.Any,
+) -> dict[str, typing.Any]:
+    return {
+        "name": str(name),
+        "number": str(number),
+        "phone": _money(phone),
+        "line": _money(line),
+        "insurance": _money(ins),
+        "usage": _money(usage),
+    }
+
+
+def _with_usage(subscriber: dict[str, typing.Any], minutes: typing.Any, messages: typing.Any, gigs: typing.Any) -> None:
+    subscriber.update(
+        minutes=int(minutes or 0),
+        messages=int(messages or 0),
+        data=decimal.Decimal(str(gigs or 0)).quantize(_DATA),
+    )
+
+
+def _charges(workbook: Workbook) -> list[dict[str, typing.Any]]:
+    """The subscriber columns of the "Charges" sheet (in its first seven rows), up to the first without a number."""
+    return [
+        _subscriber(*column)
+        for column in itertools.takewhile(
+            lambda column: column[0] is not None, _columns(workbook["Charges"], 1, 7, 2, 100)
+        )
+    ]
+
+
+def _merge(subscribers: list[dict[str, typing.Any]], usage: _Usage) -> list[dict[str, typing.Any]]:
+    numbers = {normalize_number(subscriber["number"]): subscriber for subscriber in subscribers}
+
+    for number, values in usage.items():
+        if number not in numbers:
+            raise ValueError(f"Found usage for {number}, which isn't in the charges")
+
+        _with_usage(numbers[number], *values)
+
+    return subscribers
+
+
+def user_1(workbook: Workbook) -> list[dict[str, typing.Any]]:
+    """Bills after 2020-01-30, with the usage right below each subscriber's charges."""
+    subscribers = []
+
+    for column in _columns(workbook["Charges"], 1, 11, 2, 100):
+        if column[0] is None:
+            break
+
+        subscribers.append(_subscriber(*column[:7]))
+        _with_usage(subscribers[-1], *column[8:])
+
+    return subscribers
+
+
+def user_2(workbook: Workbook) -> list[dict[str, typing.Any]]:
+    """Bills after 2019-04-18, with the usage in a table (by number) further down the "Charges" sheet."""
+    return _merge(_charges(workbook), _rows(workbook["Charges"], 15, 30, 2, 5))
+
+
+def user_3(workbook: Workbook) -> list[dict[str, typing.Any]]:
+    """Bills after 2019-01-08, with the usage in its own "Statistics" sheet."""
+    return _merge(_charges(workbook), _rows(workbook["Statistics"], 1, 100, 1, 4))
+
+
+_LAYOUTS = (
+    (datetime.date(2020, 1, 30), user_1),
+    (datetime.date(2019, 4, 18), user_2),
+    (datetime.date(2019, 1, 8), user_3),
+)
+
+
+def parse_workbook(path: pathlib.Path) -> PostFilledBill | None:
+    """Parse a legacy "Bill YYYY.MM.DD.xlsx" workbook, or skip it (returning `None`) if its layout isn't supported."""
+    name = path.stem.removeprefix("Bill ")
+
+    if name in _SKIP:
+        return None
+
+    date = datetime.date(*map(int, name.split(".")))
+    layout = next((layout for start, layout in _LAYOUTS if date > start), None)
+
+    if layout is None:
+        return None
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+
+    try:
+        subscribers = [FillSubscriber.model_validate(subscriber) for subscriber in layout(workbook)]
+
+    finally:
+        workbook.close()
+
+    return PostFilledBill(
+        date=date,
+        total=sum((subscriber.total for subscriber in subscribers), start=decimal.Decimal()),
+        subscribers=subscribers,
+    )
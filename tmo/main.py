@@ -1,5 +1,6 @@
 import logging
 import pathlib
+import typing
 from typing import Annotated, Optional
 
 import arrow
@@ -73,11 +74,20 @@ def playground(
             IPython.embed(display_banner=False)  # type: ignore[no-untyped-call]
 
 
-@update.command(help="Update the database with a single month's data fetched as a CSV")
+@update.command(help="Update the database with a single month's (or a range of months') data fetched as a CSV")
 def fetch(
     date: Annotated[Optional[str], typer.Option(help="Bill date (Format YYYY-MM-DD). Must exist on webpage")] = None,
+    start: Annotated[
+        Optional[str], typer.Option("--from", help="First bill date of a range (Format YYYY-MM-DD)")
+    ] = None,
+    end: Annotated[Optional[str], typer.Option("--to", help="Last bill date of a range (Format YYYY-MM-DD)")] = None,
+    concurrency: Annotated[int, typer.Option(min=1, help="Maximum number of months fetched at once")] = 3,
     verbose: Annotated[bool, typer.Option(help="Sets logging level to DEBUG")] = False,
     headed: Annotated[bool, typer.Option(help="Use a headed browser")] = False,
+    record: Annotated[
+        Optional[pathlib.Path], typer.Option(help="Directory to record the session into, for offline replays")
+    ] = None,
+    upsert: Annotated[bool, typer.Option(help="Update the months that already exist instead of failing")] = False,
     config_file: Annotated[Optional[pathlib.Path], typer.Option("--config", help="Path to a config file")] = None,
 ) -> None:
     import asyncio
@@ -86,15 +96,18 @@ def fetch(
     import httpx
 
     from . import config
-    from .loaders.bulk import api
+    from .lib import timing
     from .loaders.fetch import Fetcher, format_csv
+    from .loaders.replay import Fixtures
+    from .loaders.transforms import pipeline
+    from .loaders.upload import upload
 
     if config_file:
         config.from_file(config_file)
 
     with httpx.Client() as client:
         try:
-            ok = client.head("http://127.0.0.1:8000").is_success
+            ok = client.head(config.api.base_url).is_success
         except httpx.ConnectError:
             ok = False
 
@@ -112,24 +125,201 @@ def fetch(
     if verbose:
         logging.getLogger("tmo.loaders.fetch").setLevel(logging.DEBUG)
 
-    if date:
-        _date = arrow.get(date)
+    if date and (start or end):
+        typer.echo("A single date cannot be combined with a --from/--to range", err=True)
+        raise typer.Exit(1)
 
-    else:
-        _date = arrow.now()
+    if end and not start:
+        typer.echo("A --to date requires a --from date", err=True)
+        raise typer.Exit(1)
+
+    fixtures = Fixtures(record, mode="record") if record else None
+    fetcher = Fetcher.from_config(config.fetch, fixtures=fixtures, headless=not headed)
+    csvs: list[pathlib.Path] = []
+
+    try:
+        with timing.run("fetch") as run:
+            if start:
+                months = list(
+                    arrow.Arrow.range("month", arrow.get(start).floor("month"), arrow.get(end or arrow.now()))
+                )
+                csvs = list(asyncio.run(fetcher.get_csvs(months, concurrency=concurrency)).values())
+
+            else:
+                csvs = [asyncio.run(fetcher.get_csv(date=arrow.get(date) if date else arrow.now()))]
+
+            report = asyncio.run(upload(pipeline()(format_csv(csv) for csv in csvs), upsert=upsert))
+            run.meta.update(sent=report.sent, retried=report.retried)
+
+            if report.failed or (start and report.sent != len(months)):
+                raise typer.Exit(1)
+
+    finally:
+        # The reports hold billing data, so they aren't kept once they have been sent
+        for csv in csvs:
+            csv.unlink(missing_ok=True)
+
+        pacing = fetcher.pacer.report()
+        run.meta.update(paced=pacing.paced, working=pacing.working)
+        run.write(config.fetch.cache.joinpath("runs"), config.fetch.metrics)
+
+
+@app.command(help="Benchmark the Fetcher offline against a recorded session (see `tmo update fetch --record`)")
+def benchmark(
+    fixtures_path: Annotated[pathlib.Path, typer.Option("--fixtures", help="Directory of a recorded session")],
+    runs: Annotated[int, typer.Option(min=1, help="Number of replayed runs")] = 3,
+    pacing: Annotated[
+        bool, typer.Option(help="Pace the actions like a live fetch (with seeded delays) instead of not at all")
+    ] = True,
+    headed: Annotated[bool, typer.Option(help="Use a headed browser")] = False,
+    config_file: Annotated[Optional[pathlib.Path], typer.Option("--config", help="Path to a config file")] = None,
+) -> None:
+    import asyncio
+    import os
+
+    from . import config
+    from .config import Delay, Fetch, Pacing
+    from .lib import timing
+    from .loaders.fetch import Fetcher
+    from .loaders.replay import Fixtures, summarize
+
+    if config_file:
+        config.from_file(config_file)
+
+    settings = config.fetch or Fetch(username="", password="")
+
+    if not pacing:
+        none = Delay(distribution="fixed")
+        settings = settings.model_copy(update={"pacing": Pacing(click=none, keystroke=none, navigation=none)})
+
+    for key in ("username", "password", "totp_secret"):
+        os.environ[f"TMO_FETCH_{key}"] = getattr(settings, key)
+
+    fixtures = Fixtures(fixtures_path, mode="replay")
+    months = [arrow.get(month, "YYYY-MM") for month in fixtures.months]
+
+    results = []
+
+    for index in range(runs):
+        fetcher = Fetcher.from_config(settings, fixtures=fixtures, headless=not headed)
+
+        with timing.run("benchmark") as run:
+            if len(months) == 1:
+                csvs = [asyncio.run(fetcher.get_csv(months[0]))]
+
+            else:
+                csvs = list(asyncio.run(fetcher.get_csvs(months)).values())
+
+        for csv in csvs:
+            csv.unlink(missing_ok=True)
+
+        typer.echo(f"Run {index + 1}/{runs}: {run.duration:.2f}s")
+        results.append(run)
+
+    typer.echo(f"\n{'step':<16}{'mean':>10}{'min':>10}{'max':>10}")
+
+    for step, mean, low, high in summarize(results):
+        typer.echo(f"{step:<16}{mean:>10.2f}{low:>10.2f}{high:>10.2f}")
+
+
+def _convert(
+    name: str,
+    directory: pathlib.Path,
+    pattern: str,
+    workers: Optional[int],
+    output: Optional[pathlib.Path],
+    ndjson: bool,
+    **options: typing.Any,
+) -> None:
+    import contextlib
+    import sys
+
+    from . import config
+    from .lib import timing
+    from .loaders.convert import convert_directory, dump
+    from .loaders.transforms import pipeline
+
+    with timing.run(name) as run:
+        results = convert_directory(directory, pattern=pattern, workers=workers, **options)
+        bills = pipeline()(result.bill for result in results if result.bill)
+        bills.sort(key=lambda bill: bill.date)
+
+        with contextlib.ExitStack() as stack:
+            stream = stack.enter_context(output.open("w", encoding="utf8")) if output else sys.stdout
+            dump(bills, stream, ndjson=ndjson)
+
+        run.meta["files"] = [
+            {"path": str(result.path), "duration": result.duration, "error": result.error} for result in results
+        ]
+
+    if config.fetch:
+        run.write(config.fetch.cache.joinpath("runs"), config.fetch.metrics)
+
+    for result in results:
+        status = result.error or (f"{result.duration:.3f}s" if result.bill else "skipped")
+        typer.echo(f"{result.path.name}: {status}", err=True)
+
+    failed = sum(1 for result in results if result.error)
+    typer.echo(f"Converted {len(bills)} of {len(results)} files", err=True)
 
-    fetcher = Fetcher(headless=not headed)
-    csv = asyncio.run(fetcher.get_csv(date=_date))
+    if failed:
+        raise typer.Exit(1)
+
+
+@update.command("csv-dir", help="Convert a directory of report CSVs into a JSON file for `tmo update bulk`")
+def csv_dir(
+    directory: Annotated[pathlib.Path, typer.Option(help="directory of downloaded report CSVs")],
+    output: Annotated[Optional[pathlib.Path], typer.Option(help="output path (defaults to stdout)")] = None,
+    ndjson: Annotated[bool, typer.Option(help="write one bill per line instead of a JSON array")] = False,
+    pattern: Annotated[str, typer.Option(help="glob pattern for the reports")] = "*.csv",
+    workers: Annotated[Optional[int], typer.Option(min=1, help="number of worker processes")] = None,
+    config_file: Annotated[Optional[pathlib.Path], typer.Option("--config", help="path to a config file")] = None,
+) -> None:
+    from . import config
+
+    if config_file:
+        config.from_file(config_file)
+
+    _convert("csv-dir", directory, pattern, workers, output, ndjson)
 
-    data = format_csv(csv)
 
-    if not api(data=data):
+@update.command("xlsx", help="Convert a directory of legacy bill workbooks into NDJSON for `tmo update bulk`")
+def xlsx(
+    directory: Annotated[pathlib.Path, typer.Option(help='directory of "Bill YYYY.MM.DD.xlsx" workbooks')],
+    output: Annotated[Optional[pathlib.Path], typer.Option(help="output path (defaults to stdout)")] = None,
+    pattern: Annotated[str, typer.Option(help="glob pattern for the workbooks")] = "*.xlsx",
+    workers: Annotated[Optional[int], typer.Option(min=1, help="number of worker processes")] = None,
+    config_file: Annotated[Optional[pathlib.Path], typer.Option("--config", help="path to a config file")] = None,
+) -> None:
+    from . import config
+
+    try:
+        from .loaders.xlsx import parse_workbook
+
+    except ImportError:
+        typer.echo("Install the `load` extra (openpyxl) to read workbooks", err=True)
         raise typer.Exit(1)
 
+    if config_file:
+        config.from_file(config_file)
+
+    _convert("xlsx", directory, pattern, workers, output, True, parse=parse_workbook)
 
-@update.command("bulk", help="Update the database in bulk with a JSON file")
+
+@update.command("bulk", help="Update the database in bulk with a JSON (or NDJSON) file")
 def bulk(
-    path: Annotated[pathlib.Path, typer.Option(help="path to json file")],
+    path: Annotated[pathlib.Path, typer.Option(help="path to a JSON array or NDJSON file of bills")],
+    chunk_size: Annotated[int, typer.Option(min=1, help="number of bills written per transaction")] = 1000,
+    resume: Annotated[
+        bool,
+        typer.Option(help="skip the bills already in the database, or committed by an unfinished load of the file"),
+    ] = True,
+    upsert: Annotated[
+        bool, typer.Option(help="update the bills already in the database, writing only changes")
+    ] = False,
+    dry_run: Annotated[
+        bool, typer.Option(help="write everything without committing, roll back, and report the timings")
+    ] = False,
     config_file: Annotated[Optional[pathlib.Path], typer.Option("--config", help="path to a config file")] = None,
 ) -> None:
     from . import config
@@ -138,7 +328,52 @@ def bulk(
     if config_file:
         config.from_file(config_file)
 
-    write_db(path)
+    loader = write_db(path, chunk_size=chunk_size, resume=resume, upsert=upsert, dry_run=dry_run)
+
+    if dry_run:
+        typer.echo(f"Dry run (rolled back), {loader.skipped} bills already in the database")
+        typer.echo(loader.profile)
+
+    elif upsert:
+        typer.echo(f"Upserted {loader.committed} bills: {loader.changes}")
+
+    else:
+        typer.echo(f"Wrote {loader.committed} bills ({loader.skipped} already in the database)")
+
+
+@update.command("upload", help="Send a JSON (or NDJSON) file of bills to a running server, concurrently")
+def upload(
+    path: Annotated[pathlib.Path, typer.Option(help="path to a JSON array or NDJSON file of bills")],
+    url: Annotated[Optional[str], typer.Option(help="server URL (defaults to the api section of the config)")] = None,
+    concurrency: Annotated[int, typer.Option(min=1, help="maximum number of requests in flight")] = 8,
+    retries: Annotated[int, typer.Option(min=0, help="retries for connection errors and transient statuses")] = 3,
+    upsert: Annotated[bool, typer.Option(help="update the bills already on the server instead of failing")] = False,
+    config_file: Annotated[Optional[pathlib.Path], typer.Option("--config", help="path to a config file")] = None,
+) -> None:
+    import asyncio
+
+    from . import config
+    from .loaders import upload as uploader
+    from .loaders.bulk import read_bills
+
+    if config_file:
+        config.from_file(config_file)
+
+    report = asyncio.run(
+        uploader.upload(
+            read_bills(path),
+            upsert=upsert,
+            base_url=url or config.api.base_url,
+            concurrency=concurrency,
+            retries=retries,
+        )
+    )
+
+    typer.echo(report)
+
+    if report.failed:
+        typer.echo(f"Failed: {', '.join(map(str, report.failed))}", err=True)
+        raise typer.Exit(1)
 
 
 @app.command()
@@ -1,10 +1,13 @@
+import contextlib
 import http
 import os
+import typing
 
 import fastapi
 from starlette.exceptions import HTTPException
 
 from .. import config
+from .dependencies import dispose_async_engine
 from .exceptions import APIException
 from .frontend import static, templates
 from .frontend.pages import frontend
@@ -12,7 +15,16 @@ from .routers import api
 
 config.from_file(os.environ["TMO_UVICORN_CONFIG_PATH"])
 
-app = fastapi.FastAPI(debug=config.api.debug)
+
+@contextlib.asynccontextmanager
+async def lifespan(_: fastapi.FastAPI) -> typing.AsyncIterator[None]:
+    yield
+
+    # The pooled aiosqlite connections each run in a thread, which would otherwise keep the process from exiting
+    await dispose_async_engine()
+
+
+app = fastapi.FastAPI(debug=config.api.debug, lifespan=lifespan)
 app.include_router(api)
 app.include_router(frontend)
 app.mount("/static", static, "static")
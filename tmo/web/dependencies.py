@@ -1,11 +1,17 @@
+import asyncio
 import typing
 
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..db.engines import start_engine
+from ..db.engines import create_tables, start_engine
 
 engine = None
+async_engine: AsyncEngine | None = None
+
+_async_engine_lock = asyncio.Lock()
 
 
 def get_session() -> typing.Generator[Session, None, None]:
@@ -18,4 +24,27 @@ def get_session() -> typing.Generator[Session, None, None]:
         yield session
 
 
+async def get_async_session() -> typing.AsyncGenerator[AsyncSession, None]:
+    global async_engine
+
+    if async_engine is None:
+        async with _async_engine_lock:
+            if async_engine is None:
+                created = start_engine(asynchronous=True)
+                await create_tables(created)
+                async_engine = created
+
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def dispose_async_engine() -> None:
+    global async_engine
+
+    if async_engine is not None:
+        await async_engine.dispose()
+        async_engine = None
+
+
 SessionDependency = typing.Annotated[Session, Depends(get_session)]
+AsyncSessionDependency = typing.Annotated[AsyncSession, Depends(get_async_session)]
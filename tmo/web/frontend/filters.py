@@ -1,12 +1,14 @@
 import collections
 import datetime
 import decimal
+import functools
 import typing
 
 import arrow
 from pydantic import BaseModel, Field, dataclasses, field_validator, model_validator
 
 from ...config import config
+from ...lib.index import SubscriberIndex
 from ..routers.models.get import BillRender, SubscriberReadWithDetails
 
 Unset = object()
@@ -98,16 +100,15 @@ class BillsRender(BaseModel):
     @property
     def owed(self) -> dict[str, decimal.Decimal]:
         owed: dict[str, decimal.Decimal] = collections.defaultdict(decimal.Decimal)
+        split = self.split_charges if config.frontend.dependents else decimal.Decimal()
 
         for subscriber in self.current.subscribers:
-            if not config.frontend.dependents.get(subscriber.number):
+            if not (dependents := config.frontend.dependents.get(subscriber.number)):
                 continue
 
-            for dependent in config.frontend.dependents[subscriber.number]:
+            for dependent in dependents:
                 try:
-                    owed[self._split(subscriber.name)] += (
-                        self._lookup_subscriber(number=dependent).details.total + self.split_charges
-                    )
+                    owed[self._split(subscriber.name)] += self.index.lookup(number=dependent).details.total + split
 
                 except LookupError:
                     continue
@@ -133,19 +134,12 @@ class BillsRender(BaseModel):
             for charge in sorted(self.current.charges, key=lambda k: k.name)
         ]
 
-    def _lookup_subscriber(self, *, name: str = "", number: str = "") -> SubscriberReadWithDetails:
-        number = number.replace("-", "")
-
-        if name and number or (name == "" and number == ""):
-            raise ValueError("Must supply exactly one of name or number, but not both.")
+    @functools.cached_property
+    def index(self) -> SubscriberIndex[SubscriberReadWithDetails]:
+        return SubscriberIndex(self.current.subscribers)
 
-        for subscriber in self.current.subscribers:
-            if number and subscriber.number.replace("-", "") == number:
-                return subscriber
-            if name and subscriber.name == name:
-                return subscriber
-
-        raise LookupError(f"Could not find the user: {name if name else number}")
+    def _lookup_subscriber(self, *, name: str = "", number: str = "") -> SubscriberReadWithDetails:
+        return self.index.lookup(name=name, number=number)
 
     @model_validator(mode="before")
     @classmethod
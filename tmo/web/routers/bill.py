@@ -5,11 +5,12 @@ import typing
 import fastapi
 import pydantic
 from sqlalchemy.orm import joinedload
-from sqlmodel import Session, col, select
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ...db.models import Bill, Detail, Subscriber
 from ...lib.utilities import cast_as_qa
-from ..dependencies import SessionDependency
+from ..dependencies import AsyncSessionDependency
 from ..exceptions import APIException
 from .models.get import ReadBill, ReadBillSubscribersChargesDetail, ReadBillSubscriberTotalsCharges
 from .models.post import PostBill
@@ -22,9 +23,9 @@ async def get_bills(
     *,
     start: typing.Annotated[int, fastapi.Query(ge=0)] = 0,
     count: typing.Annotated[int, fastapi.Query(gt=1, le=100)] = 10,
-    session: SessionDependency,
+    session: AsyncSessionDependency,
 ) -> list[ReadBill]:
-    bills = session.exec(select(Bill).order_by(col(Bill.id).asc()).offset(start).limit(count)).all()
+    bills = (await session.exec(select(Bill).order_by(col(Bill.id).asc()).offset(start).limit(count))).all()
     return bills
 
 
@@ -37,37 +38,37 @@ async def get_previous_ids(
         le=datetime.date(3000, 12, 31),  # type: ignore[arg-type]
     ),
     count: int = fastapi.Query(default=2, le=5),
-    session: SessionDependency,
+    session: AsyncSessionDependency,
 ) -> list[int]:
-    return session.exec(select(Bill.id).where(Bill.date <= before).limit(count).order_by(col(Bill.date).desc())).all()
+    return (
+        await session.exec(select(Bill.id).where(Bill.date <= before).limit(count).order_by(col(Bill.date).desc()))
+    ).all()
 
 
 async def _get_bill(
     *,
     id: int,
-    session: Session,
+    session: AsyncSession,
 ) -> Bill | None:
-    return (
-        session.exec(
-            select(Bill)
-            .where(Bill.id == id)
-            .options(
-                joinedload(cast_as_qa(Bill.charges)),
-                joinedload(cast_as_qa(Bill.subscribers)).joinedload(
-                    cast_as_qa(Subscriber.details).and_(col(Detail.bill_id) == id)
-                ),
-            )
+    bills = await session.exec(
+        select(Bill)
+        .where(Bill.id == id)
+        .options(
+            joinedload(cast_as_qa(Bill.charges)),
+            joinedload(cast_as_qa(Bill.subscribers)).joinedload(
+                cast_as_qa(Subscriber.details).and_(col(Detail.bill_id) == id)
+            ),
         )
-        .unique()
-        .first()
     )
 
+    return bills.unique().first()
+
 
 @router.get("/bill/{id}")
 async def get_bill_id(
     *,
     id: int = fastapi.Path(ge=0),
-    session: SessionDependency,
+    session: AsyncSessionDependency,
 ) -> ReadBillSubscriberTotalsCharges:
     bill = await _get_bill(id=id, session=session)
 
@@ -80,7 +81,7 @@ async def get_bill_id(
 async def get_bill_detailed(
     *,
     id: int = fastapi.Path(ge=0),
-    session: SessionDependency,
+    session: AsyncSessionDependency,
 ) -> ReadBillSubscribersChargesDetail:
     bill = await _get_bill(id=id, session=session)
 
@@ -94,7 +95,7 @@ async def get_bill_date(
     *,
     year: typing.Annotated[int, pydantic.Field(ge=2000, le=3000)],
     month: typing.Annotated[int, pydantic.Field(ge=1, le=12)],
-    session: SessionDependency,
+    session: AsyncSessionDependency,
 ) -> ReadBillSubscriberTotalsCharges:
     subquery = (
         select(Bill.id)
@@ -104,22 +105,19 @@ async def get_bill_date(
         .scalar_subquery()
     )
 
-    bill = (
-        session.exec(
-            select(Bill)
-            .where(Bill.id == subquery)
-            .order_by(col(Bill.date).asc())
-            .limit(1)
-            .options(
-                joinedload(cast_as_qa(Bill.charges)),
-                joinedload(cast_as_qa(Bill.subscribers)).joinedload(
-                    cast_as_qa(Subscriber.details).and_(col(Detail.bill_id) == subquery)
-                ),
-            )
+    bills = await session.exec(
+        select(Bill)
+        .where(Bill.id == subquery)
+        .order_by(col(Bill.date).asc())
+        .limit(1)
+        .options(
+            joinedload(cast_as_qa(Bill.charges)),
+            joinedload(cast_as_qa(Bill.subscribers)).joinedload(
+                cast_as_qa(Subscriber.details).and_(col(Detail.bill_id) == subquery)
+            ),
         )
-        .unique()
-        .first()
     )
+    bill = bills.unique().first()
 
     if not bill:
         raise APIException(status_code=fastapi.status.HTTP_404_NOT_FOUND, detail="Bill could not be found")
@@ -127,13 +125,13 @@ async def get_bill_date(
 
 
 @router.post("/bill")
-async def post_bill(*, data: PostBill, session: SessionDependency) -> ReadBill:
+async def post_bill(*, data: PostBill, session: AsyncSessionDependency) -> ReadBill:
     if data.date.day != 1:
         raise APIException(
             status_code=fastapi.status.HTTP_400_BAD_REQUEST, detail="Bill day must be the first day of the month"
         )
 
-    bill = session.exec(select(Bill).where(Bill.date == data.date)).first()
+    bill = (await session.exec(select(Bill).where(Bill.date == data.date))).first()
 
     if bill is not None:
         raise APIException(
@@ -144,7 +142,7 @@ async def post_bill(*, data: PostBill, session: SessionDependency) -> ReadBill:
     bill = Bill(date=data.date, total=data.total)
 
     session.add(bill)
-    session.commit()
-    session.refresh(bill)
+    await session.commit()
+    await session.refresh(bill)
 
     return bill
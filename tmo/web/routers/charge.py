@@ -2,9 +2,11 @@
 import typing
 
 import fastapi
+from sqlalchemy.orm import selectinload
 
 from ...db.models import Bill, Charge
-from ..dependencies import SessionDependency
+from ...lib.utilities import cast_as_qa
+from ..dependencies import AsyncSessionDependency
 from ..exceptions import APIException
 from .models.get import ReadChargeId
 from .models.post import PostCharge
@@ -17,9 +19,12 @@ async def post_charge(
     *,
     data: PostCharge,
     bill_id: typing.Annotated[int, fastapi.Query(alias="bill")],
-    session: SessionDependency,
+    session: AsyncSessionDependency,
 ) -> ReadChargeId:
-    bill = session.get(Bill, bill_id)
+    # Both collections are needed to update the total, and can't be lazy loaded by an async session
+    bill = await session.get(
+        Bill, bill_id, options=[selectinload(cast_as_qa(Bill.charges)), selectinload(cast_as_qa(Bill.details))]
+    )
 
     if bill is None:
         raise APIException(status_code=fastapi.status.HTTP_404_NOT_FOUND, detail="Bill could not be found")
@@ -30,7 +35,7 @@ async def post_charge(
     bill.update_total()
 
     session.add(bill)
-    session.commit()
-    session.refresh(charge)
+    await session.commit()
+    await session.refresh(charge)
 
     return charge
@@ -2,9 +2,11 @@
 import typing
 
 import fastapi
+from sqlalchemy.orm import selectinload
 
 from ...db.models import Bill, Detail, Subscriber
-from ..dependencies import SessionDependency
+from ...lib.utilities import cast_as_qa
+from ..dependencies import AsyncSessionDependency
 from ..exceptions import APIException
 from .models.get import ReadDetail
 from .models.post import PostDetail
@@ -18,14 +20,27 @@ async def post_detail(
     data: PostDetail,
     bill_id: typing.Annotated[int, fastapi.Query(alias="bill")],
     subscriber_id: typing.Annotated[int, fastapi.Query(alias="subscriber")],
-    session: SessionDependency,
+    session: AsyncSessionDependency,
 ) -> ReadDetail:
-    bill = session.get(Bill, bill_id)
+    # Every collection changed below has to be loaded up front, as an async session can't lazy load them
+    bill = await session.get(
+        Bill,
+        bill_id,
+        options=[
+            selectinload(cast_as_qa(Bill.charges)),
+            selectinload(cast_as_qa(Bill.details)),
+            selectinload(cast_as_qa(Bill.subscribers)),
+        ],
+    )
 
     if bill is None:
         raise APIException(status_code=fastapi.status.HTTP_404_NOT_FOUND, detail="Bill could not be found")
 
-    subscriber = session.get(Subscriber, subscriber_id)
+    subscriber = await session.get(
+        Subscriber,
+        subscriber_id,
+        options=[selectinload(cast_as_qa(Subscriber.details)), selectinload(cast_as_qa(Subscriber.bills))],
+    )
 
     if subscriber is None:
         raise APIException(status_code=fastapi.status.HTTP_404_NOT_FOUND, detail="Subscriber could not be found")
@@ -42,7 +57,7 @@ async def post_detail(
         subscriber.bills.append(bill)
 
     session.add(bill)
-    session.commit()
-    session.refresh(detail)
+    await session.commit()
+    await session.refresh(detail)
 
     return detail
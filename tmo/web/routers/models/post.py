@@ -1,4 +1,5 @@
 import decimal
+import functools
 import typing
 
 import pydantic
@@ -14,16 +15,15 @@ class PostSubscriber(SubscriberScalar):
     pass
 
 
+@functools.cache
+def _currency_fields(model: type[DetailScalar]) -> tuple[str, ...]:
+    return tuple(name for name, info in model.model_fields.items() if name != "total" and "$" in info.metadata)
+
+
 class PostDetail(DetailScalar):
     @pydantic.model_validator(mode="after")
     def calculate_total(self) -> typing.Self:
-        total = decimal.Decimal()
-
-        for name, info in self.model_fields.items():
-            if name != "total" and "$" in info.metadata:
-                total += getattr(self, name)
-
-        self.total = total
+        self.total = sum((getattr(self, name) for name in _currency_fields(type(self))), start=decimal.Decimal())
         return self
 
 
@@ -38,3 +38,38 @@ class FillSubscriber(PostSubscriber, PostDetail):
 class PostFilledBill(PostBill):
     subscribers: list[FillSubscriber] = pydantic.Field(default_factory=list)
     charges: list[PostCharge] = pydantic.Field(default_factory=list)
+
+    @classmethod
+    def merge(cls, bills: list[typing.Self]) -> typing.Self:
+        """Merge the entries for a single date, adding up the details of a subscriber (and the charges with a name)
+        that appear in more than one of them, as upserts key the details by subscriber and the charges by name.
+        """
+        if len(bills) == 1:
+            return bills[0]
+
+        fields = [name for name in PostDetail.model_fields if name != "total"]
+        subscribers: dict[str, dict[str, typing.Any]] = {}
+        charges: dict[str, dict[str, typing.Any]] = {}
+
+        for bill in bills:
+            for data in bill.subscribers:
+                if (merged := subscribers.get(data.number)) is None:
+                    subscribers[data.number] = data.model_dump(exclude={"total"})
+
+                else:
+                    for field in fields:
+                        merged[field] += getattr(data, field)
+
+            for charge in bill.charges:
+                if (merged := charges.get(charge.name)) is None:
+                    charges[charge.name] = charge.model_dump()
+
+                else:
+                    merged["total"] += charge.total
+
+        return cls(
+            date=bills[0].date,
+            total=sum((bill.total for bill in bills), start=decimal.Decimal()),
+            subscribers=[FillSubscriber.model_validate(data) for data in subscribers.values()],
+            charges=[PostCharge.model_validate(charge) for charge in charges.values()],
+        )
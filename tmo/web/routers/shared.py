@@ -1,40 +1,231 @@
 # mypy: disable-error-code="return-value"
+import codecs
+import collections.abc
+import datetime
+import json
+import logging
+import typing
+
 import fastapi
-from sqlmodel import select
+import pydantic
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.types import Receive, Scope, Send
 
-from ...db.models import Bill, Charge, Detail, Subscriber
-from ..dependencies import SessionDependency
+from ...db.models import Bill, BillSubscriberLink, Charge, Detail, Subscriber
+from ...db.upsert import read_bill, upsert_bill
+from ...lib.index import SubscriberIndex
+from ...lib.records import RecordDecoder
+from ..dependencies import AsyncSessionDependency
+from ..exceptions import APIException
 from .models.get import ReadBill
 from .models.post import PostFilledBill
+from .subscriber import find_subscribers
+
+logger = logging.getLogger(__name__)
 
 router = fastapi.APIRouter()
 
 
 @router.post("/fill")
-async def post_filled_bill(*, data: PostFilledBill, session: SessionDependency) -> ReadBill:
-    with session.begin_nested() as transaction:
-        with session.begin_nested() as bill_transaction:
-            _bill = Bill(date=data.date, total=data.total)
+async def post_filled_bill(*, data: PostFilledBill, upsert: bool = False, session: AsyncSessionDependency) -> ReadBill:
+    if upsert:
+        return await _upsert_filled_bill(data, session)
 
-            session.add(_bill)
-            bill_transaction.commit()
+    subscribers = await find_subscribers(session, (subscriber.number for subscriber in data.subscribers))
+    ids = {subscriber.number: subscribers.lookup(number=subscriber.number).id for subscriber in data.subscribers}
 
-        with session.begin_nested() as charge_transaction:
-            for _charge in data.charges:
-                session.add(Charge(name=_charge.name, split=_charge.split, total=_charge.total, bill_id=_bill.id))
+    # The rows are added by id rather than through the relationships, which an async session can't lazy load
+    _bill = Bill(date=data.date, total=data.total)
+    session.add(_bill)
 
-            charge_transaction.commit()
+    try:
+        await session.flush()
 
-        with session.begin_nested() as subscriber_transaction:
-            for subscriber in data.subscribers:
-                _subscriber = session.exec(select(Subscriber).where(Subscriber.number == subscriber.number)).one()
-                _detail = Detail(**subscriber.model_dump(), bill_id=_bill.id, subscriber_id=_subscriber.id)
+    except sqlalchemy.exc.IntegrityError as error:
+        await session.rollback()
+        raise APIException(
+            status_code=fastapi.status.HTTP_409_CONFLICT,
+            detail=f"A bill with the date {data.date} already exists (upsert to update it)",
+        ) from error
 
-                _subscriber.details.append(_detail)
-                _subscriber.bills.append(_bill)
-                session.add(_subscriber)
-            subscriber_transaction.commit()
+    session.add_all(
+        Charge(name=_charge.name, split=_charge.split, total=_charge.total, bill_id=_bill.id)
+        for _charge in data.charges
+    )
+    session.add_all(
+        Detail(**subscriber.model_dump(), bill_id=_bill.id, subscriber_id=ids[subscriber.number])
+        for subscriber in data.subscribers
+    )
+    session.add_all(BillSubscriberLink(bill_id=_bill.id, subscriber_id=id) for id in set(ids.values()))
 
-        transaction.commit()
+    await session.commit()
 
     return _bill
+
+
+async def _upsert_filled_bill(data: PostFilledBill, session: AsyncSession) -> Bill:
+    subscribers = await find_subscribers(session, (subscriber.number for subscriber in data.subscribers))
+    ids = {subscriber.number: subscribers.lookup(number=subscriber.number).id for subscriber in data.subscribers}
+
+    bill_id, changes = await session.run_sync(lambda sync: upsert_bill(sync.connection(), data, ids))
+    await session.commit()
+
+    logger.info("Upserted the bill for %s: %s", data.date, changes)
+
+    return await session.get_one(Bill, bill_id, populate_existing=True)
+
+
+class _StatusStream(fastapi.responses.StreamingResponse):
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # The body is still being read while the statuses are sent, so (unlike the base class) this mustn't also wait on
+        # `receive` for a disconnect; reading the body raises `ClientDisconnect` instead
+        await self.stream_response(send)
+
+
+@router.post("/fill/batch", response_class=_StatusStream)
+async def post_filled_bills(
+    *,
+    request: fastapi.Request,
+    upsert: bool = False,
+    chunk_size: typing.Annotated[int, fastapi.Query(ge=1, le=1000)] = 100,
+    session: AsyncSessionDependency,
+) -> _StatusStream:
+    """Fill the bills streamed as a JSON array (or NDJSON) body, committing every `chunk_size` of them.
+
+    The response streams one JSON line per record with its `index`, `status` (created, updated, unchanged or failed)
+    and the bill `id` or the `error`. A record that fails doesn't affect the others, but the batch stops at the first
+    malformed JSON.
+    """
+    bind = session.bind
+
+    if isinstance(bind, AsyncConnection):
+        bind = bind.engine
+
+    if not isinstance(bind, AsyncEngine):
+        raise APIException(
+            status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Batches can only be filled through a session bound to a database engine",
+        )
+
+    return _StatusStream(_fill_batch(request.stream(), bind, upsert=upsert, chunk_size=chunk_size))
+
+
+async def _fill_batch(
+    body: collections.abc.AsyncIterator[bytes],
+    engine: AsyncEngine,
+    upsert: bool,
+    chunk_size: int,
+) -> collections.abc.AsyncIterator[str]:
+    decoder = RecordDecoder()
+    text = codecs.getincrementaldecoder("utf8")()
+    chunk: list[tuple[int, PostFilledBill | str]] = []
+    upserted: set[datetime.date] = set()
+
+    async def records() -> collections.abc.AsyncIterator[typing.Any]:
+        async for data in body:
+            for value in decoder.feed(text.decode(data)):
+                yield value
+
+        for value in decoder.feed(text.decode(b"", final=True)) + decoder.close():
+            yield value
+
+    # The request's session is closed once the response is returned, before it is streamed
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        subscribers = SubscriberIndex((await session.exec(select(Subscriber))).all())
+        index = 0
+
+        try:
+            async for value in records():
+                try:
+                    chunk.append((index, PostFilledBill.model_validate(value)))
+
+                except pydantic.ValidationError as error:
+                    chunk.append((index, f"Invalid bill: {error.errors(include_url=False)}"))
+
+                index += 1
+
+                if len(chunk) == chunk_size:
+                    for status in await session.run_sync(_fill_chunk, subscribers, chunk, upsert, upserted):
+                        yield json.dumps(status) + "\n"
+
+                    chunk.clear()
+
+        except (json.JSONDecodeError, UnicodeDecodeError) as error:
+            chunk.append((index, f"Invalid JSON: {error}"))
+
+        for status in await session.run_sync(_fill_chunk, subscribers, chunk, upsert, upserted):
+            yield json.dumps(status) + "\n"
+
+
+def _fill_chunk(
+    session: sqlalchemy.orm.Session,
+    subscribers: SubscriberIndex[Subscriber],
+    chunk: list[tuple[int, PostFilledBill | str]],
+    upsert: bool,
+    upserted: set[datetime.date],
+) -> list[dict[str, typing.Any]]:
+    """Fill the bills of a chunk, each in a savepoint of its own.
+
+    When upserting, a bill for a date already upserted by the batch is merged into the stored one (rather than
+    replacing it), the same way the bulk loader merges the entries of a file that share a date.
+    """
+    dates = [bill.date for _, bill in chunk if not isinstance(bill, str)]
+    existing = set(session.scalars(select(col(Bill.date)).where(col(Bill.date).in_(dates))))
+    filled: set[datetime.date] = set()
+    statuses: list[dict[str, typing.Any]] = []
+
+    for index, bill in chunk:
+        if isinstance(bill, str):
+            statuses.append({"index": index, "status": "failed", "error": bill})
+            continue
+
+        status = {"index": index, "date": bill.date.isoformat()}
+
+        try:
+            if bill.date in existing and not upsert:
+                raise ValueError(f"There is already a bill for {bill.date}")
+
+            with session.begin_nested():
+                if bill.date in upserted or bill.date in filled:
+                    bill = PostFilledBill.merge([read_bill(session.connection(), bill.date), bill])
+
+                ids = {data.number: subscribers.lookup(number=data.number).id for data in bill.subscribers}
+                status["id"], changes = upsert_bill(session.connection(), bill, ids)
+
+        except (LookupError, ValueError, sqlalchemy.exc.SQLAlchemyError) as error:
+            statuses.append({**status, "status": "failed", "error": str(error)})
+            continue
+
+        if upsert:
+            filled.add(bill.date)
+
+        if bill.date not in existing:
+            status["status"] = "created"
+            existing.add(bill.date)
+
+        else:
+            status["status"] = "updated" if changes.changed else "unchanged"
+
+        statuses.append(status)
+
+    try:
+        session.commit()
+
+    except sqlalchemy.exc.SQLAlchemyError as error:
+        session.rollback()
+        logger.exception("Could not commit a chunk of %d bills", len(chunk))
+
+        return [
+            {**status, "status": "failed", "error": str(error)} if status["status"] != "failed" else status
+            for status in statuses
+        ]
+
+    upserted.update(filled)
+    logger.info("Filled a chunk of %d bills", len(chunk))
+
+    return statuses
@@ -1,14 +1,18 @@
 # mypy: disable-error-code="return-value"
+import collections.abc
 import typing
 
 import fastapi
 import pydantic
+import sqlalchemy
 from sqlalchemy.orm import contains_eager
 from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ...db.models.tables import Detail, Subscriber
+from ...lib.index import SEPARATORS, SubscriberIndex, normalize_number
 from ...lib.utilities import cast_as_qa
-from ..dependencies import SessionDependency
+from ..dependencies import AsyncSessionDependency
 from ..exceptions import APIException
 from .models.get import ReadSubscriber, ReadSubscriberDetails
 from .models.post import PostSubscriber
@@ -16,14 +20,39 @@ from .models.post import PostSubscriber
 router = fastapi.APIRouter()
 
 
+def _normalized(number: typing.Any) -> typing.Any:
+    for separator in SEPARATORS:
+        number = sqlalchemy.func.replace(number, separator, "")
+
+    return number
+
+
+async def find_subscribers(
+    session: AsyncSession, numbers: collections.abc.Iterable[str]
+) -> SubscriberIndex[Subscriber]:
+    """The subscribers with any of the `numbers`, matched on the (indexed) number column, and only for the numbers
+    that aren't found that way on the normalized number (compared in SQL, rather than loading every subscriber).
+    """
+    numbers = set(numbers)
+    subscribers = list((await session.exec(select(Subscriber).where(col(Subscriber.number).in_(numbers)))).all())
+    index = SubscriberIndex(subscribers)
+
+    if missing := {normalize_number(number) for number in numbers if number not in index}:
+        query = select(Subscriber).where(_normalized(col(Subscriber.number)).in_(missing))
+        subscribers.extend((await session.exec(query)).all())
+        index = SubscriberIndex(subscribers)
+
+    return index
+
+
 @router.get("/subscriber")
 async def get_subscribers(
     *,
     start: typing.Annotated[int, fastapi.Query(ge=0)] = 0,
     count: typing.Annotated[int, fastapi.Query(gt=1, le=100)] = 10,
-    session: SessionDependency,
+    session: AsyncSessionDependency,
 ) -> list[ReadSubscriber]:
-    return session.exec(select(Subscriber).order_by(col(Subscriber.id).asc()).offset(start).limit(count)).all()
+    return (await session.exec(select(Subscriber).order_by(col(Subscriber.id).asc()).offset(start).limit(count))).all()
 
 
 class Lookup(pydantic.BaseModel):
@@ -37,19 +66,17 @@ class Lookup(pydantic.BaseModel):
 
 
 @router.get("/subscriber/lookup")
-async def get_subscriber_lookup(*, name: str = "", number: str = "", session: SessionDependency) -> ReadSubscriber:
+async def get_subscriber_lookup(*, name: str = "", number: str = "", session: AsyncSessionDependency) -> ReadSubscriber:
     if name and number or (not name and not number):
         raise APIException(
             status_code=fastapi.status.HTTP_400_BAD_REQUEST, detail="Exactly one of name or number must be provided"
         )
 
     if name:
-        sql_query = Subscriber.name == name
+        subscriber = (await session.exec(select(Subscriber).where(Subscriber.name == name))).one_or_none()
 
-    if number:
-        sql_query = Subscriber.number == number
-
-    subscriber = session.exec(select(Subscriber).where(sql_query)).one_or_none()
+    else:
+        subscriber = (await find_subscribers(session, [number])).get(number)
 
     if not subscriber:
         raise APIException(status_code=fastapi.status.HTTP_404_NOT_FOUND, detail="Subscriber could not be found")
@@ -61,19 +88,16 @@ async def get_subscriber_lookup(*, name: str = "", number: str = "", session: Se
 async def get_subscriber(
     *,
     id: typing.Annotated[int, fastapi.Path(ge=0)],
-    session: SessionDependency,
+    session: AsyncSessionDependency,
 ) -> ReadSubscriberDetails:
-    subscriber = (
-        session.exec(
-            select(Subscriber)
-            .join(Detail)
-            .options(contains_eager(cast_as_qa(Subscriber.details)))
-            .order_by(col(Detail.bill_id).asc())
-            .where(Subscriber.id == id)
-        )
-        .unique()
-        .first()
+    subscribers = await session.exec(
+        select(Subscriber)
+        .join(Detail)
+        .options(contains_eager(cast_as_qa(Subscriber.details)))
+        .order_by(col(Detail.bill_id).asc())
+        .where(Subscriber.id == id)
     )
+    subscriber = subscribers.unique().first()
 
     if not subscriber:
         raise APIException(status_code=fastapi.status.HTTP_404_NOT_FOUND, detail="Subscriber could not be found")
@@ -82,8 +106,8 @@ async def get_subscriber(
 
 
 @router.post("/subscriber")
-async def post_subscriber(*, data: PostSubscriber, session: SessionDependency) -> ReadSubscriber:
-    subscriber = session.exec(select(Subscriber).where(Subscriber.number == data.number)).first()
+async def post_subscriber(*, data: PostSubscriber, session: AsyncSessionDependency) -> ReadSubscriber:
+    subscriber = (await find_subscribers(session, [data.number])).get(data.number)
 
     if subscriber is not None:
         raise APIException(
@@ -94,7 +118,7 @@ async def post_subscriber(*, data: PostSubscriber, session: SessionDependency) -
     subscriber = Subscriber(name=data.name, number=data.number, format=data.format)
 
     session.add(subscriber)
-    session.commit()
-    session.refresh(subscriber)
+    await session.commit()
+    await session.refresh(subscriber)
 
     return subscriber